@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Shared JSON writer for the analysis and export scripts
+Uses orjson when installed (C encoder, NumPy scalars and arrays serialized
+directly) and falls back to the standard library json module otherwise
+"""
+
+import json
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+def write_json(path, obj):
+    """Write obj to path as indented JSON"""
+    if HAS_ORJSON:
+        # orjson returns bytes; written as-is without a decoded str copy
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        # np.float64 subclasses float, so the stdlib encoder accepts it too
+        with open(path, 'w') as f:
+            json.dump(obj, f, indent=2)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Shared Western Ghats boundary loader for the Earth Engine export scripts
+Resolves the boundary GeoJSON to polygon exterior-ring coordinates (WGS84,
+repaired and simplified) and caches them as JSON keyed by the source file's mtime
+"""
+
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+CACHE_NAME = ".ee_boundary_cache.json"
+
+# ~100 m tolerance: well below dataset noise, far fewer vertices sent to EE
+SIMPLIFY_TOLERANCE_DEG = 0.001
+# Bump whenever _resolve_coords changes its output (repair, ring extraction,
+# ...) so caches written by older code are rebuilt
+PROCESSING_VERSION = 3
+
+def _resolve_coords(boundary_file):
+    """Read, repair and simplify the boundary; return one coordinate list per polygon"""
+    import geopandas as gpd
+    import shapely
+
+    try:
+        # Vectorized GDAL read straight into Arrow buffers
+        gdf = gpd.read_file(boundary_file, engine="pyogrio", use_arrow=True)
+    except Exception:
+        # Older geopandas or no pyogrio/pyarrow: use the default engine
+        gdf = gpd.read_file(boundary_file)
+    if gdf.crs is None or gdf.crs.to_epsg() != 4326:
+        gdf = gdf.to_crs(epsg=4326)
+    # Repair invalid rings with GEOS MakeValid (cheaper than a zero-width buffer)
+    gdf['geometry'] = shapely.make_valid(gdf.geometry.to_numpy())
+    gdf['geometry'] = gdf.geometry.simplify(SIMPLIFY_TOLERANCE_DEG, preserve_topology=True)
+
+    boundary_geom = gdf.geometry.iloc[0] if len(gdf) == 1 else gdf.geometry.union_all()
+    # Exterior ring of every polygon part, extracted in one vectorized shapely call.
+    # make_valid can return a GeometryCollection that nests a MultiPolygon next
+    # to stray line parts, so parts are flattened twice before keeping polygons
+    parts = shapely.get_parts(shapely.get_parts(boundary_geom))
+    parts = parts[shapely.get_type_id(parts) == 3]
+    if len(parts) == 0:
+        raise ValueError(f"No polygon parts left in {boundary_file} after repair")
+    rings = shapely.get_exterior_ring(parts)
+    ring_coords = np.split(shapely.get_coordinates(rings), np.cumsum(shapely.get_num_coordinates(rings))[:-1])
+    return [ring.tolist() for ring in ring_coords]
+
+def load_boundary_coords(boundary_file, cache_dir):
+    """Return boundary polygon coordinates, reusing the JSON cache when it is current"""
+    boundary_file = Path(boundary_file)
+    cache_file = Path(cache_dir) / CACHE_NAME
+    key = {
+        'source': str(boundary_file.resolve()),
+        'mtime': boundary_file.stat().st_mtime,
+        'tolerance': SIMPLIFY_TOLERANCE_DEG,
+        'version': PROCESSING_VERSION
+    }
+
+    if cache_file.exists():
+        try:
+            with open(cache_file) as f:
+                cached = json.load(f)
+            if cached.get('key') == key:
+                return cached['coords']
+        except (OSError, ValueError, KeyError):
+            pass  # Unreadable cache: rebuild below
+
+    coords = _resolve_coords(boundary_file)
+    # Write-then-rename so an interrupted or concurrent run never reads a
+    # truncated cache
+    tmp_file = cache_file.with_suffix('.json.part')
+    with open(tmp_file, 'w') as f:
+        json.dump({'key': key, 'coords': coords}, f)
+    os.replace(tmp_file, cache_file)
+    return coords
@@ -83,6 +83,10 @@ def _hex_to_rgb(hex_color: str) -> tuple[int, int, int]:
     return int(hex_color[0:2], 16), int(hex_color[2:4], 16), int(hex_color[4:6], 16)
 
 
+# Palette as (R, G, B) tuples, parsed once; CLASS_COLORS stays the source of truth
+CLASS_RGB = {label: _hex_to_rgb(color) for label, color in CLASS_COLORS.items()}
+
+
 def _run(cmd: list[str]) -> None:
     proc = subprocess.run(cmd, capture_output=True, text=True)
     if proc.returncode != 0:
@@ -200,9 +204,9 @@ def write_color_files(paths: dict[str, Path]) -> dict[str, Path]:
     lines = ["# value R G B A\n"]
     for code in sorted(LULC_CLASSES.keys()):
         label = LULC_CLASSES[code]
-        if label not in CLASS_COLORS:
+        if label not in CLASS_RGB:
             continue
-        r, g, b = _hex_to_rgb(CLASS_COLORS[label])
+        r, g, b = CLASS_RGB[label]
         lines.append(f"{code} {r} {g} {b} 255\n")
     # nodata (255) -> transparent
     lines.append("255 0 0 0 0\n")
@@ -211,7 +215,7 @@ def write_color_files(paths: dict[str, Path]) -> dict[str, Path]:
 
     # Binary rasters
     built_txt = paths["meta"] / "built_binary_colors.txt"
-    r, g, b = _hex_to_rgb(CLASS_COLORS["Built"])
+    r, g, b = CLASS_RGB["Built"]
     built_txt.write_text(
         "".join(
             [
@@ -225,7 +229,7 @@ def write_color_files(paths: dict[str, Path]) -> dict[str, Path]:
     out["built"] = built_txt
 
     trees_txt = paths["meta"] / "trees_binary_colors.txt"
-    r, g, b = _hex_to_rgb(CLASS_COLORS["Trees"])
+    r, g, b = CLASS_RGB["Trees"]
     trees_txt.write_text(
         "".join(
             [
@@ -204,10 +204,11 @@ def main() -> int:
 
     covered_pairs = _flatten_active_locations(active)
 
-    wg_df["corestack_covered"] = wg_df.apply(
-        lambda row: (row["state_corestack"], row["district_corestack"]) in covered_pairs,
-        axis=1,
-    )
+    # Zip the two columns directly instead of building a Series per row.
+    wg_df["corestack_covered"] = [
+        pair in covered_pairs
+        for pair in zip(wg_df["state_corestack"], wg_df["district_corestack"])
+    ]
 
     wg_df.to_csv(OUTPUT_DIR / "wg_district_coverage.csv", index=False)
 
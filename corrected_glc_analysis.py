@@ -6,6 +6,7 @@ Fixed to properly handle the tile-based structure with band-per-year
 
 import ee
 import geopandas as gpd
+import shapely
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
@@ -51,20 +52,15 @@ print(f"Total study area: {area_km2:.0f} km²")
 # Convert to Earth Engine geometry
 def convert_to_ee_geometry(gdf):
     """Convert GeoDataFrame to Earth Engine Geometry"""
-    # Fix invalid geometries with buffer
+    # Repair invalid rings and thin vertices (~100 m) locally, both vectorized
     gdf_fixed = gdf.copy()
-    gdf_fixed['geometry'] = gdf_fixed.geometry.buffer(0)
-    geom = gdf_fixed.geometry.union_all()
+    gdf_fixed['geometry'] = shapely.make_valid(gdf_fixed.geometry.to_numpy())
+    gdf_fixed['geometry'] = gdf_fixed.geometry.simplify(0.001, preserve_topology=True)
     
-    if geom.geom_type == 'Polygon':
-        coords = [list(geom.exterior.coords)]
-        return ee.Geometry.Polygon(coords)
-    elif geom.geom_type == 'MultiPolygon':
-        polygons = []
-        for polygon in geom.geoms:
-            coords = [list(polygon.exterior.coords)]
-            polygons.append(coords)
-        return ee.Geometry.MultiPolygon(polygons)
+    # Union the features server-side; the dissolved geometry is what every
+    # later clip() and reduceRegion() runs against
+    ee_fc = ee.FeatureCollection(json.loads(gdf_fixed.to_json()))
+    return ee_fc.geometry(maxError=100).dissolve(maxError=100)
 
 western_ghats_ee = convert_to_ee_geometry(western_ghats_wgs84)
 STUDY_AREA_KM2 = western_ghats_ee.area().getInfo() / 1e6
@@ -106,9 +102,9 @@ SIMPLIFIED_CLASSES = {
 
 print(f"\nClass mapping: {len(GLC_TO_SIMPLIFIED)} GLC classes -> {len(SIMPLIFIED_CLASSES)} simplified classes")
 
-def analyze_glc_year(year, region_ee, use_midpoint=True):
+def select_glc_year(year, region_ee, use_midpoint=True):
     """
-    Analyze GLC-FCS30D for a specific year
+    Build the simplified GLC-FCS30D class image for a specific year
     
     Parameters:
     - year: Year to analyze (1985-2022)
@@ -116,126 +112,124 @@ def analyze_glc_year(year, region_ee, use_midpoint=True):
     - use_midpoint: For 5-year periods, use midpoint year (e.g., 1987 for 1985-1989)
     
     Returns:
-    - Dictionary with results
+    - Dictionary with year metadata and the class image, or None if unavailable
     """
     
-    print(f"\n{'='*70}")
-    print(f"ANALYZING YEAR {year}")
-    print(f"{'='*70}")
-    
-    start_time = time.time()
-    
-    try:
-        # Determine which collection and band to use
-        if year <= 1999:
-            # Use five-year collection
-            if 1985 <= year <= 1989:
-                band = 'b1'
-                period = '1985-1989'
-                representative_year = 1987 if use_midpoint else year
-            elif 1990 <= year <= 1994:
-                band = 'b2'
-                period = '1990-1994'
-                representative_year = 1992 if use_midpoint else year
-            elif 1995 <= year <= 1999:
-                band = 'b3'
-                period = '1995-1999'
-                representative_year = 1997 if use_midpoint else year
-            else:
-                print(f"ERROR: Year {year} not available in five-year collection")
-                return None
-            
-            print(f"Using five-year collection, period: {period}, band: {band}")
-            lc_image = glc_fcs_five_year.select([band]).mosaic()
-            band_to_analyze = band
-            
+    # Determine which collection and band to use
+    if year <= 1999:
+        # Use five-year collection
+        if 1985 <= year <= 1989:
+            band = 'b1'
+            period = '1985-1989'
+            representative_year = 1987 if use_midpoint else year
+        elif 1990 <= year <= 1994:
+            band = 'b2'
+            period = '1990-1994'
+            representative_year = 1992 if use_midpoint else year
+        elif 1995 <= year <= 1999:
+            band = 'b3'
+            period = '1995-1999'
+            representative_year = 1997 if use_midpoint else year
         else:
-            # Use annual collection (2000-2022)
-            if 2000 <= year <= 2022:
-                band_index = year - 2000 + 1
-                band = f'b{band_index}'
-                period = str(year)
-                representative_year = year
-                
-                print(f"Using annual collection, year: {year}, band: {band}")
-                lc_image = glc_fcs_annual.select([band]).mosaic()
-                band_to_analyze = band
-            else:
-                print(f"ERROR: Year {year} not available (range: 1985-2022)")
-                return None
-        
-        # Clip to study region
-        lc_clipped = lc_image.clip(region_ee)
+            print(f"ERROR: Year {year} not available in five-year collection")
+            return None
         
-        # Remap to simplified classes
-        print(f"Remapping GLC classes to simplified categories...")
-        from_values = list(GLC_TO_SIMPLIFIED.keys())
-        to_values = list(GLC_TO_SIMPLIFIED.values())
+        print(f"{year}: five-year collection, period: {period}, band: {band}")
+        lc_image = glc_fcs_five_year.select([band]).mosaic()
         
-        lc_simplified = lc_clipped.select([band_to_analyze]).remap(
-            from_values, to_values, 
-            defaultValue=7  # Default to Bare
-        )
-        
-        # Calculate areas
-        print(f"Calculating areas for each land cover class...")
-        results = {
-            'year': representative_year,
-            'period': period,
-            'dataset': 'GLC-FCS30D'
+    else:
+        # Use annual collection (2000-2022)
+        if 2000 <= year <= 2022:
+            band = f'b{year - 2000 + 1}'
+            period = str(year)
+            representative_year = year
+            
+            print(f"{year}: annual collection, band: {band}")
+            lc_image = glc_fcs_annual.select([band]).mosaic()
+        else:
+            print(f"ERROR: Year {year} not available (range: 1985-2022)")
+            return None
+    
+    # Clip to study region and remap to simplified classes
+    from_values = list(GLC_TO_SIMPLIFIED.keys())
+    to_values = list(GLC_TO_SIMPLIFIED.values())
+    
+    lc_simplified = lc_image.clip(region_ee).select([band]).remap(
+        from_values, to_values, 
+        defaultValue=7  # Default to Bare
+    )
+    
+    return {
+        'year': representative_year,
+        'period': period,
+        'image': lc_simplified
+    }
+
+def class_areas_by_year(year_images, region_ee):
+    """
+    Class areas (km²) for several years in a single Earth Engine request
+    
+    Each year is one grouped pixel-area sum. The years form one image
+    collection and the reduction is mapped over it, so the reducer graph is
+    sent once rather than per year, EE schedules the years together, and the
+    results come back in one getInfo() round trip.
+    
+    Returns:
+    - {year: {class_id: area_km2}}, without years that produced no groups
+    """
+    pixel_area = ee.Image.pixelArea()
+    
+    def reduce_year(lc_simplified):
+        groups = pixel_area.addBands(lc_simplified.rename('class')).reduceRegion(
+            reducer=ee.Reducer.sum().group(groupField=1, groupName='class'),
+            geometry=region_ee,
+            scale=30,  # 30m resolution
+            maxPixels=1e10,
+            bestEffort=True
+        ).get('groups')
+        return ee.Feature(None, {'year': lc_simplified.get('year'), 'groups': groups})
+    
+    years = ee.ImageCollection.fromImages(
+        [lc_simplified.set('year', year) for year, lc_simplified in year_images.items()]
+    )
+    rows = ee.FeatureCollection(years.map(reduce_year)).getInfo()['features']
+    # A year whose reduction came back empty is left out (the caller reports
+    # it) instead of failing the years that did reduce
+    return {
+        row['properties']['year']: {
+            int(group['class']): group['sum'] / 1e6 for group in row['properties']['groups']
         }
+        for row in rows
+        if row['properties'].get('groups')
+    }
+
+def summarize_glc_year(meta, class_areas):
+    """Assemble the result row for one year from its class areas"""
+    results = {
+        'year': meta['year'],
+        'period': meta['period'],
+        'dataset': 'GLC-FCS30D'
+    }
+    
+    print(f"\n{meta['year']} ({meta['period']}):")
+    for class_id, class_name in SIMPLIFIED_CLASSES.items():
+        area_km2 = class_areas.get(class_id, 0)
+        results[class_name] = area_km2
         
-        pixel_area = ee.Image.pixelArea()
-        
-        for class_id, class_name in SIMPLIFIED_CLASSES.items():
-            try:
-                # Create mask for this class
-                class_mask = lc_simplified.eq(class_id)
-                
-                # Calculate area
-                area_m2 = pixel_area.updateMask(class_mask).reduceRegion(
-                    reducer=ee.Reducer.sum(),
-                    geometry=region_ee,
-                    scale=30,  # 30m resolution
-                    maxPixels=1e10,
-                    bestEffort=True
-                ).getInfo()
-                
-                # Convert to km²
-                area_km2 = area_m2.get('area', 0) / 1e6
-                results[class_name] = area_km2
-                
-                if area_km2 > 0.1:
-                    percentage = (area_km2 / STUDY_AREA_KM2) * 100
-                    print(f"   {class_name}: {area_km2:.1f} km² ({percentage:.1f}%)")
-                    
-            except Exception as e:
-                print(f"   ERROR calculating {class_name}: {e}")
-                results[class_name] = 0
-        
-        # Calculate totals and percentages
-        total_area = sum([v for k, v in results.items() 
-                         if k not in ['year', 'period', 'dataset'] and isinstance(v, (int, float))])
-        results['total_area_km2'] = total_area
-        
-        for class_name in SIMPLIFIED_CLASSES.values():
-            if class_name in results and total_area > 0:
-                percentage = (results[class_name] / total_area) * 100
-                results[f'{class_name}_percent'] = percentage
-        
-        elapsed = (time.time() - start_time) / 60
-        print(f"SUCCESS: Completed in {elapsed:.1f} minutes")
-        print(f"Total classified area: {total_area:.1f} km² ({(total_area/STUDY_AREA_KM2)*100:.1f}% of study area)")
-        
-        return results
-        
-    except Exception as e:
-        elapsed = (time.time() - start_time) / 60
-        print(f"ERROR: Analysis FAILED after {elapsed:.1f} minutes")
-        print(f"Error details: {e}")
-        import traceback
-        traceback.print_exc()
-        return None
+        if area_km2 > 0.1:
+            percentage = (area_km2 / STUDY_AREA_KM2) * 100
+            print(f"   {class_name}: {area_km2:.1f} km² ({percentage:.1f}%)")
+    
+    # Calculate totals and percentages
+    total_area = sum(results[class_name] for class_name in SIMPLIFIED_CLASSES.values())
+    results['total_area_km2'] = total_area
+    
+    for class_name in SIMPLIFIED_CLASSES.values():
+        if total_area > 0:
+            results[f'{class_name}_percent'] = (results[class_name] / total_area) * 100
+    
+    print(f"   Total classified area: {total_area:.1f} km² ({(total_area/STUDY_AREA_KM2)*100:.1f}% of study area)")
+    return results
 
 # Define years to analyze
 # Use midpoint years for 5-year periods, then annual from 2000
@@ -248,20 +242,46 @@ historical_years = [
 
 print(f"\nStarting analysis for {len(historical_years)} years...")
 print(f"Years: {historical_years}")
-print("This may take 30-60 minutes...\n")
 
 historical_results = []
 
+# Build every year's class image first (lazy, no server calls yet)
+year_meta = {}
 for year in historical_years:
-    result = analyze_glc_year(year, western_ghats_ee, use_midpoint=True)
-    if result:
-        historical_results.append(result)
-        print(f"✓ {year} complete")
+    meta = select_glc_year(year, western_ghats_ee, use_midpoint=True)
+    if meta:
+        year_meta[year] = meta
     else:
         print(f"✗ {year} failed")
-    
-    # Pause between requests
-    time.sleep(3)
+
+print(f"\nCalculating class areas for {len(year_meta)} years in one request...")
+start_time = time.time()
+failed_years = set()
+try:
+    areas_by_year = class_areas_by_year(
+        {year: meta['image'] for year, meta in year_meta.items()}, western_ghats_ee
+    )
+    print(f"SUCCESS: Completed in {(time.time() - start_time) / 60:.1f} minutes")
+except Exception as e:
+    # A timeout or memory error anywhere fails the whole batch; redo the years
+    # one request each so a failure only costs its own year
+    print(f"Batched request failed after {(time.time() - start_time) / 60:.1f} minutes: {e}")
+    print("Falling back to one request per year...")
+    areas_by_year = {}
+    for year, meta in year_meta.items():
+        try:
+            areas_by_year.update(class_areas_by_year({year: meta['image']}, western_ghats_ee))
+        except Exception as e:
+            failed_years.add(year)
+            print(f"✗ {year} failed")
+            print(f"Error details: {e}")
+
+for year, meta in year_meta.items():
+    if year in areas_by_year:
+        historical_results.append(summarize_glc_year(meta, areas_by_year[year]))
+        print(f"✓ {year} complete")
+    elif year not in failed_years:
+        print(f"✗ {year} failed (no class areas returned)")
 
 # Convert to DataFrame and save
 if historical_results:
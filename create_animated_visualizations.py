@@ -24,6 +24,8 @@ import os
 from pathlib import Path
 import geopandas as gpd
 import json
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 
 # Initialize Earth Engine
 ee.Initialize(project='ee-tkkrfirst')
@@ -66,6 +68,10 @@ CLASS_NAMES = {
     8: 'Snow/ice'
 }
 
+# Full-extent frames only feed a GIF, so render them at a fixed size (longest
+# edge, pixels) rather than 100 m, which would be ~16,000 px tall for the range
+FRAME_DIMENSIONS = 1200
+
 # Output directory
 output_dir = Path(r"C:\Users\trkumar\OneDrive - Deloitte (O365D)\Documents\Research\Western Ghats\outputs\animations")
 output_dir.mkdir(parents=True, exist_ok=True)
@@ -140,8 +146,9 @@ def get_dynamic_world(year):
     
     return classification.rename('classification')
 
+@lru_cache(maxsize=None)
 def get_lulc_for_year(year):
-    """Get LULC classification for any year"""
+    """Get LULC classification for any year (built once, shared by all passes)"""
     if year < 2018:
         return get_glc_fcs30d(year)
     else:
@@ -149,11 +156,9 @@ def get_lulc_for_year(year):
 
 def create_visualization(lulc_image, title="", year=None):
     """Create RGB visualization with title overlay"""
-    # Remap classes to color indices
-    vis_image = lulc_image.remap(
-        list(CLASS_COLORS.keys()),
-        list(range(len(CLASS_COLORS)))
-    ).visualize(
+    # Class values 0-8 index the palette directly, so visualize() acts as a
+    # single lookup table (no remap pass needed)
+    vis_image = lulc_image.visualize(
         min=0,
         max=8,
         palette=list(CLASS_COLORS.values())
@@ -161,6 +166,26 @@ def create_visualization(lulc_image, title="", year=None):
     
     return vis_image
 
+@lru_cache(maxsize=None)
+def get_frame_image(year):
+    """Visualized LULC frame for a year, shared by full and hotspot exports"""
+    return create_visualization(get_lulc_for_year(year), year=year)
+
+def start_tasks(queued, max_workers=16):
+    """Start queued (name, task) exports concurrently; return the names that started"""
+    def start(item):
+        name, task = item
+        try:
+            task.start()
+            return name
+        except Exception as e:
+            print(f"  ✗ Failed to start {name} - {e}")
+            return None
+    
+    # Each start() is a blocking round-trip to the EE API
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return [name for name in executor.map(start, queued) if name]
+
 def create_zoom_region(coords, buffer_deg):
     """Create bounding box for hotspot zoom"""
     lon, lat = coords
@@ -181,15 +206,12 @@ print("="*80)
 
 timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
 
-# Track export tasks
-export_tasks = []
-
 # 1. Full Western Ghats extent for each year
 print("\n1. Exporting full Western Ghats frames...")
+full_queue = []
 for year in YEARS:
     try:
-        lulc = get_lulc_for_year(year)
-        vis_image = create_visualization(lulc, year=year)
+        vis_image = get_frame_image(year)
         
         task = ee.batch.Export.image.toDrive(
             image=vis_image,
@@ -197,21 +219,22 @@ for year in YEARS:
             folder='Western_Ghats_Animations',
             fileNamePrefix=f'frame_full_{year:04d}',
             region=cepf_boundary.geometry(),
-            scale=100,  # 100m for faster processing
+            dimensions=FRAME_DIMENSIONS,
             maxPixels=1e10,
             fileFormat='GeoTIFF'
         )
-        task.start()
-        export_tasks.append(f'frame_full_{year:04d}')
-        print(f"  ✓ Exported: {year}")
+        full_queue.append((f'frame_full_{year:04d}', task))
+        print(f"  ✓ Queued: {year}")
     except Exception as e:
         print(f"  ✗ Failed: {year} - {e}")
 
+export_tasks = start_tasks(full_queue)
+
 print(f"\nTotal full frames exported: {len(export_tasks)}")
 
 # 2. Hotspot zoom frames
 print("\n2. Exporting hotspot zoom frames...")
-hotspot_tasks = []
+hotspot_queue = []
 
 for hotspot_name, hotspot_data in HOTSPOTS.items():
     print(f"\n  Processing: {hotspot_data['description']}")
@@ -223,8 +246,7 @@ for hotspot_name, hotspot_data in HOTSPOTS.items():
     
     for year in [1987, 1995, 2000, 2005, 2010, 2015, 2018, 2020, 2022, 2025]:  # Key years only
         try:
-            lulc = get_lulc_for_year(year)
-            vis_image = create_visualization(lulc, year=year)
+            vis_image = get_frame_image(year)
             
             task = ee.batch.Export.image.toDrive(
                 image=vis_image,
@@ -236,19 +258,20 @@ for hotspot_name, hotspot_data in HOTSPOTS.items():
                 maxPixels=1e10,
                 fileFormat='GeoTIFF'
             )
-            task.start()
-            hotspot_tasks.append(f'hotspot_{hotspot_name}_{year:04d}')
+            hotspot_queue.append((f'hotspot_{hotspot_name}_{year:04d}', task))
             print(f"    ✓ {year}")
         except Exception as e:
             print(f"    ✗ {year} - {e}")
 
+hotspot_tasks = start_tasks(hotspot_queue)
+
 print(f"\nTotal hotspot frames exported: {len(hotspot_tasks)}")
 
 # 3. Change intensity maps (highlighting areas of change)
 print("\n3. Exporting change intensity maps...")
 
 # Calculate change for every 5-year period
-change_tasks = []
+change_queue = []
 base_years = list(range(1987, 2026, 5))
 
 for i in range(len(base_years) - 1):
@@ -285,16 +308,17 @@ for i in range(len(base_years) - 1):
             folder='Western_Ghats_Animations',
             fileNamePrefix=f'change_{year_start}_to_{year_end}',
             region=cepf_boundary.geometry(),
-            scale=100,
+            dimensions=FRAME_DIMENSIONS,
             maxPixels=1e10,
             fileFormat='GeoTIFF'
         )
-        task.start()
-        change_tasks.append(f'change_{year_start}_to_{year_end}')
+        change_queue.append((f'change_{year_start}_to_{year_end}', task))
         print(f"  ✓ Change map: {year_start} → {year_end}")
     except Exception as e:
         print(f"  ✗ Failed: {year_start} → {year_end} - {e}")
 
+change_tasks = start_tasks(change_queue)
+
 print(f"\nTotal change maps exported: {len(change_tasks)}")
 
 # ============================================================================
@@ -311,12 +335,10 @@ Process downloaded frames into animated GIFs
 
 Run this after downloading all frames from Google Drive
 
-Prerequisites: pip install imageio pillow numpy
+Prerequisites: pip install pillow
 """
 
-import imageio
-from PIL import Image, ImageDraw, ImageFont
-import numpy as np
+from PIL import Image, ImageDraw, ImageFont, features
 from pathlib import Path
 import glob
 
@@ -331,6 +353,86 @@ output_dir.mkdir(parents=True, exist_ok=True)
 fps = 2  # Frames per second
 duration_per_frame = 0.5  # seconds
 
+# Label backgrounds are identical for every frame of the same size, so each
+# one is rasterized once and reused
+_overlay_cache = {}
+
+def label_overlay(size, box, fill):
+    """Transparent RGBA layer with a filled label box, cached per (size, box, fill)"""
+    key = (size, tuple(box), fill)
+    if key not in _overlay_cache:
+        overlay = Image.new('RGBA', size, (255, 255, 255, 0))
+        ImageDraw.Draw(overlay).rectangle(box, fill=fill)
+        _overlay_cache[key] = overlay
+    return _overlay_cache[key]
+
+def load_font(size):
+    """Arial at the given size, or PIL's default font if unavailable"""
+    try:
+        return ImageFont.truetype("arial.ttf", size)
+    except:
+        return ImageFont.load_default()
+
+# Every colour a frame can contain: the LULC class colours, the change-map
+# channel combinations (R 0/255, G 0/200, B 0/100), black no-data and the label
+# text colours. Label boxes are black at alpha 180/200, so each of those also
+# appears darkened underneath them
+CLASS_COLOURS = __CLASS_COLOURS__
+CHANGE_COLOURS = [(r, g, b) for r in (0, 255) for g in (0, 200) for b in (0, 100)]
+TEXT_COLOURS = [(255, 255, 255), (255, 255, 0), (255, 0, 0), (150, 150, 150)]
+LABEL_ALPHAS = (180, 200)
+
+def build_frame_palette():
+    """Fixed 'P' image holding the colour table shared by every frame"""
+    base = [tuple(int(h[i:i + 2], 16) for i in (1, 3, 5)) for h in CLASS_COLOURS]
+    base += CHANGE_COLOURS + TEXT_COLOURS
+    shaded = [tuple(round(c * (255 - a) / 255) for c in rgb) for rgb in base for a in LABEL_ALPHAS]
+    colours = list(dict.fromkeys(base + shaded))
+    palette_img = Image.new('P', (1, 1))
+    palette_img.putpalette([v for rgb in colours for v in rgb] + [0, 0, 0] * (256 - len(colours)))
+    return palette_img
+
+FRAME_PALETTE = build_frame_palette()
+
+def to_palette(img):
+    """Map a labelled frame onto the fixed frame palette (8-bit, no dithering)
+    
+    The table is built from the known class, change and label colours rather
+    than from any one frame, so a class that only appears in later years keeps
+    its exact colour and the GIF needs a single global palette. Anti-aliased
+    text edges snap to the nearest entry.
+    """
+    return img.convert('RGB').quantize(palette=FRAME_PALETTE, dither=Image.Dither.NONE)
+
+# Lossless animated WebP codes long runs of flat class colour far tighter
+# than GIF's LZW; written alongside the GIF when Pillow has WebP support
+HAS_WEBP = features.check('webp')
+
+def save_animation(path, frames, duration_s):
+    """Write palette frames as a looping GIF (no per-frame re-quantization),
+    plus a lossless animated WebP next to it when supported"""
+    duration_ms = int(duration_s * 1000)
+    frames[0].save(path, save_all=True, append_images=frames[1:],
+                   duration=duration_ms, loop=0, optimize=True)
+    if HAS_WEBP:
+        frames[0].save(path.with_suffix('.webp'), save_all=True, append_images=frames[1:],
+                       duration=duration_ms, loop=0, lossless=True)
+
+def load_frame(frame_path):
+    """Decode a downloaded frame to RGBA and close its file straight away
+    
+    Only the small palette copy of each frame is kept for the GIF, so the
+    full-colour raster and the TIFF handle are released after every frame.
+    """
+    with Image.open(frame_path) as src:
+        return src.convert('RGBA')
+
+# Fonts are the same for every frame, so load them once up front
+font = load_font(40)
+font_title = load_font(30)
+font_year = load_font(50)
+font_legend = load_font(25)
+
 # 1. Create full Western Ghats animation
 print("\\n1. Creating full Western Ghats time-lapse...")
 full_frames = sorted(glob.glob(str(input_dir / "frame_full_*.tif")))
@@ -338,17 +440,13 @@ full_frames = sorted(glob.glob(str(input_dir / "frame_full_*.tif")))
 if full_frames:
     images = []
     for frame_path in full_frames:
-        img = Image.open(frame_path)
+        img = load_frame(frame_path)
         
         # Extract year from filename
         year = int(Path(frame_path).stem.split('_')[-1])
         
         # Add year label
         draw = ImageDraw.Draw(img)
-        try:
-            font = ImageFont.truetype("arial.ttf", 40)
-        except:
-            font = ImageFont.load_default()
         
         # Add semi-transparent background for text
         text = f"Year: {year}"
@@ -365,20 +463,18 @@ if full_frames:
         ]
         
         # Draw background
-        overlay = Image.new('RGBA', img.size, (255, 255, 255, 0))
-        overlay_draw = ImageDraw.Draw(overlay)
-        overlay_draw.rectangle(bg_bbox, fill=(0, 0, 0, 180))
-        img = Image.alpha_composite(img.convert('RGBA'), overlay)
+        overlay = label_overlay(img.size, bg_bbox, (0, 0, 0, 180))
+        img = Image.alpha_composite(img, overlay)
         
         # Draw text
         draw = ImageDraw.Draw(img)
         draw.text((padding*2, padding*2), text, fill=(255, 255, 255), font=font)
         
-        images.append(np.array(img.convert('RGB')))
+        images.append(to_palette(img))
     
     # Save as GIF
     output_path = output_dir / "western_ghats_1987_2025.gif"
-    imageio.mimsave(output_path, images, duration=duration_per_frame, loop=0)
+    save_animation(output_path, images, duration_per_frame)
     print(f"  ✓ Saved: {output_path}")
     print(f"    Frames: {len(images)}, Size: {output_path.stat().st_size / 1024 / 1024:.1f} MB")
 else:
@@ -394,34 +490,24 @@ for hotspot in hotspots:
     if hotspot_frames:
         images = []
         for frame_path in hotspot_frames:
-            img = Image.open(frame_path)
+            img = load_frame(frame_path)
             year = int(Path(frame_path).stem.split('_')[-1])
             
-            # Add labels
-            draw = ImageDraw.Draw(img)
-            try:
-                font_title = ImageFont.truetype("arial.ttf", 30)
-                font_year = ImageFont.truetype("arial.ttf", 50)
-            except:
-                font_title = font_year = ImageFont.load_default()
-            
             # Add title and year
-            img_rgba = img.convert('RGBA')
-            overlay = Image.new('RGBA', img.size, (255, 255, 255, 0))
-            overlay_draw = ImageDraw.Draw(overlay)
+            img_rgba = img
             
             # Background for title
-            overlay_draw.rectangle([10, 10, 500, 80], fill=(0, 0, 0, 180))
+            overlay = label_overlay(img.size, [10, 10, 500, 80], (0, 0, 0, 180))
             img_rgba = Image.alpha_composite(img_rgba, overlay)
             
             draw = ImageDraw.Draw(img_rgba)
             draw.text((20, 20), hotspot.replace('_', ' '), fill=(255, 255, 255), font=font_title)
             draw.text((20, 50), f"Year: {year}", fill=(255, 255, 0), font=font_year)
             
-            images.append(np.array(img_rgba.convert('RGB')))
+            images.append(to_palette(img_rgba))
         
         output_path = output_dir / f"hotspot_{hotspot}.gif"
-        imageio.mimsave(output_path, images, duration=duration_per_frame * 2, loop=0)
+        save_animation(output_path, images, duration_per_frame * 2)
         print(f"  ✓ {hotspot}: {len(images)} frames, {output_path.stat().st_size / 1024:.0f} KB")
     else:
         print(f"  ✗ {hotspot}: No frames found")
@@ -433,7 +519,7 @@ change_frames = sorted(glob.glob(str(input_dir / "change_*.tif")))
 if change_frames:
     images = []
     for frame_path in change_frames:
-        img = Image.open(frame_path)
+        img = load_frame(frame_path)
         
         # Extract years from filename (e.g., change_1987_to_1992.tif)
         parts = Path(frame_path).stem.split('_')
@@ -441,30 +527,22 @@ if change_frames:
         year_end = parts[3]
         
         # Add legend
-        draw = ImageDraw.Draw(img)
-        try:
-            font = ImageFont.truetype("arial.ttf", 25)
-        except:
-            font = ImageFont.load_default()
-        
-        img_rgba = img.convert('RGBA')
-        overlay = Image.new('RGBA', img.size, (255, 255, 255, 0))
-        overlay_draw = ImageDraw.Draw(overlay)
+        img_rgba = img
         
         # Legend background
-        overlay_draw.rectangle([10, 10, 400, 140], fill=(0, 0, 0, 200))
+        overlay = label_overlay(img.size, [10, 10, 400, 140], (0, 0, 0, 200))
         img_rgba = Image.alpha_composite(img_rgba, overlay)
         
         draw = ImageDraw.Draw(img_rgba)
-        draw.text((20, 20), f"Changes: {year_start} → {year_end}", fill=(255, 255, 255), font=font)
-        draw.text((20, 55), "■ Forest Loss", fill=(255, 0, 0), font=font)
-        draw.text((20, 85), "■ Urban Growth", fill=(255, 255, 0), font=font)
-        draw.text((20, 115), "■ Other Changes", fill=(150, 150, 150), font=font)
+        draw.text((20, 20), f"Changes: {year_start} → {year_end}", fill=(255, 255, 255), font=font_legend)
+        draw.text((20, 55), "■ Forest Loss", fill=(255, 0, 0), font=font_legend)
+        draw.text((20, 85), "■ Urban Growth", fill=(255, 255, 0), font=font_legend)
+        draw.text((20, 115), "■ Other Changes", fill=(150, 150, 150), font=font_legend)
         
-        images.append(np.array(img_rgba.convert('RGB')))
+        images.append(to_palette(img_rgba))
     
     output_path = output_dir / "change_intensity_1987_2025.gif"
-    imageio.mimsave(output_path, images, duration=1.0, loop=0)
+    save_animation(output_path, images, 1.0)
     print(f"  ✓ Saved: {output_path}")
 else:
     print("  ✗ No change frames found")
@@ -474,9 +552,9 @@ print("ANIMATION GENERATION COMPLETE!")
 print("="*80)
 print(f"\\nOutput directory: {output_dir}")
 print("\\nGenerated files:")
-for gif_file in sorted(output_dir.glob("*.gif")):
-    print(f"  - {gif_file.name} ({gif_file.stat().st_size / 1024 / 1024:.1f} MB)")
-'''
+for anim_file in sorted([*output_dir.glob("*.gif"), *output_dir.glob("*.webp")]):
+    print(f"  - {anim_file.name} ({anim_file.stat().st_size / 1024 / 1024:.1f} MB)")
+'''.replace('__CLASS_COLOURS__', repr(list(CLASS_COLORS.values())))
 
 # Save the local processing script
 local_script_path = output_dir / 'create_gifs_from_exports.py'
@@ -516,7 +594,7 @@ NEXT STEPS:
    {local_script_path}
    
 4. Install required Python packages:
-   pip install imageio pillow numpy
+   pip install pillow
 
 5. Run the local script to generate GIFs:
    python {local_script_path}
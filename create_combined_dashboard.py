@@ -55,12 +55,12 @@ combined_csv = output_dir / f"complete_lulc_1987_2025_{timestamp}.csv"
 combined_df.to_csv(combined_csv, index=False)
 print(f"\n✓ Saved: {combined_csv}")
 
-# Calculate statistics
+# Calculate statistics (row totals from one contiguous class-area array)
 df = combined_df.copy()
-df['total_computed'] = df[['Water', 'Trees', 'Grass', 'Flooded vegetation', 
-                           'Crops', 'Shrub and scrub', 'Built', 'Bare', 'Snow and ice']].sum(axis=1)
+class_totals = df[historical_cols[2:]].to_numpy(dtype=np.float64).sum(axis=1)
+df['total_computed'] = class_totals
 
-area_mean = df['total_computed'].mean()
+area_mean = class_totals.mean()
 trees_first = df.iloc[0]['Trees']
 trees_last = df.iloc[-1]['Trees']
 trees_change = ((trees_last - trees_first) / trees_first) * 100
@@ -102,7 +102,9 @@ print(f"\n{'=' * 80}")
 print(f"GENERATING HTML DASHBOARD")
 print(f"{'=' * 80}")
 
-html_content = f"""<!DOCTYPE html>
+# The page is assembled as a list of fragments and streamed to disk in one
+# writelines() call, rather than re-copying a growing string on every append
+html_parts = [f"""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -333,13 +335,13 @@ html_content = f"""<!DOCTYPE html>
             <div class="year-selector">
                 <label for="yearSelect">Select Year:</label>
                 <select id="yearSelect" onchange="updateYearData()">
-"""
+"""]
 
 # Add year options
 for year in df['year'].values:
-    html_content += f'                    <option value="{int(year)}">{int(year)}</option>\n'
+    html_parts.append(f'                    <option value="{int(year)}">{int(year)}</option>\n')
 
-html_content += """                </select>
+html_parts.append("""                </select>
             </div>
             
             <div class="data-table">
@@ -376,22 +378,22 @@ html_content += """                </select>
     
     <script>
         // Data
-        const data = """
+        const data = """)
 
-# Add JavaScript data
-html_content += "{\n"
-for idx, row in df.iterrows():
-    year = int(row['year'])
-    html_content += f"    {year}: {{\n"
-    for col in ['Water', 'Trees', 'Grass', 'Flooded vegetation', 'Crops', 'Shrub and scrub', 'Built', 'Bare']:
-        html_content += f"        '{col}': {row[col]:.2f},\n"
-    total = row['total_computed']
-    html_content += f"        'Total': {total:.2f},\n"
-    html_content += f"        'Dataset': '{row['dataset']}'\n"
-    html_content += "    },\n"
-html_content += "};\n"
+# Add JavaScript data, read straight from the column arrays
+data_cols = ['Water', 'Trees', 'Grass', 'Flooded vegetation', 'Crops', 'Shrub and scrub', 'Built', 'Bare']
+html_parts.append("{\n")
+for year, values, total, dataset in zip(df['year'].astype(int).to_numpy(), df[data_cols].to_numpy(),
+                                        df['total_computed'].to_numpy(), df['dataset'].to_numpy()):
+    html_parts.append(f"    {year}: {{\n")
+    for col, value in zip(data_cols, values):
+        html_parts.append(f"        '{col}': {value:.2f},\n")
+    html_parts.append(f"        'Total': {total:.2f},\n")
+    html_parts.append(f"        'Dataset': '{dataset}'\n")
+    html_parts.append("    },\n")
+html_parts.append("};\n")
 
-html_content += f"""
+html_parts.append(f"""
         const colors = {{
             'Water': '{LULC_COLORS['Water']}',
             'Trees': '{LULC_COLORS['Trees']}',
@@ -403,27 +405,29 @@ html_content += f"""
             'Bare': '{LULC_COLORS['Bare']}'
         }};
         
-        function updateYearData() {{
-            const year = document.getElementById('yearSelect').value;
-            document.getElementById('selectedYear').textContent = year;
-            
+        const classes = ['Water', 'Trees', 'Grass', 'Flooded vegetation', 'Crops', 'Shrub and scrub', 'Built', 'Bare'];
+        
+        // Table body markup for every year, built once at load so a year
+        // change is a single lookup and one DOM write
+        const rowsByYear = {{}};
+        Object.keys(data).forEach(year => {{
             const yearData = data[year];
-            const tbody = document.getElementById('dataTableBody');
-            tbody.innerHTML = '';
-            
-            const classes = ['Water', 'Trees', 'Grass', 'Flooded vegetation', 'Crops', 'Shrub and scrub', 'Built', 'Bare'];
-            
-            classes.forEach(cls => {{
+            rowsByYear[year] = classes.map(cls => {{
                 const area = yearData[cls];
                 const pct = (area / yearData['Total']) * 100;
                 
-                const row = `<tr>
+                return `<tr>
                     <td><span class="color-box" style="background: ${{colors[cls]}}"></span>${{cls}}</td>
                     <td>${{area.toFixed(2).toLocaleString()}}</td>
                     <td>${{pct.toFixed(1)}}%</td>
                 </tr>`;
-                tbody.innerHTML += row;
-            }});
+            }}).join('');
+        }});
+        
+        function updateYearData() {{
+            const year = document.getElementById('yearSelect').value;
+            document.getElementById('selectedYear').textContent = year;
+            document.getElementById('dataTableBody').innerHTML = rowsByYear[year] || '';
         }}
         
         // Initialize with first year
@@ -553,12 +557,12 @@ html_content += f"""
     </script>
 </body>
 </html>
-"""
+""")
 
 # Save dashboard
 dashboard_file = output_dir / f"complete_lulc_dashboard_1987_2025_{timestamp}.html"
 with open(dashboard_file, 'w', encoding='utf-8') as f:
-    f.write(html_content)
+    f.writelines(html_parts)
 
 print(f"✓ Dashboard created: {dashboard_file}")
 print(f"  File size: {dashboard_file.stat().st_size / 1024:.2f} KB")
@@ -5,16 +5,36 @@ Combines GLC-FCS30D (1987-2015) with Dynamic World (2018-2025)
 Exports shapefiles for 5-year intervals and generates comprehensive dashboard
 """
 
+import argparse
 import ee
-import geopandas as gpd
 import pandas as pd
 import numpy as np
+from functools import lru_cache
 from pathlib import Path
-import json
+from _load_boundary import load_boundary_coords
+from _json_io import write_json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+# Vector polygons are only needed for a few reference years; vectorizing every
+# export year burns most of the EE quota
+VECTOR_YEARS = {2000, 2010, 2020, 2025}
+
+parser = argparse.ArgumentParser(description="Export complete historical LULC rasters and vectors (1987-2025)")
+parser.add_argument(
+    "--vector-years",
+    type=int,
+    nargs="+",
+    default=sorted(VECTOR_YEARS),
+    help=f"Years to export tree/built vectors for (default: {' '.join(map(str, sorted(VECTOR_YEARS)))})",
+)
+args = parser.parse_args()
+VECTOR_YEARS = set(args.vector_years)
+
 print("=" * 80)
 print("COMPLETE HISTORICAL LULC ANALYSIS (1987-2025)")
 print("=" * 80)
@@ -36,27 +56,12 @@ geospatial_dir.mkdir(exist_ok=True)
 # Load boundary
 print("\nLoading Western Ghats boundary...")
 boundary_file = output_dir / "western_ghats_boundary_20250928_203521.geojson"
-gdf = gpd.read_file(boundary_file)
-gdf = gdf.to_crs(epsg=4326)
-gdf['geometry'] = gdf['geometry'].buffer(0)
-
-# Convert to Earth Engine geometry
-if len(gdf) == 1:
-    geom = gdf.geometry.iloc[0]
-    if geom.geom_type == 'Polygon':
-        coords = [list(geom.exterior.coords)]
-    elif geom.geom_type == 'MultiPolygon':
-        coords = [list(poly.exterior.coords) for poly in geom.geoms]
-    else:
-        coords = [list(geom.exterior.coords)]
-else:
-    union_geom = gdf.geometry.union_all()
-    if union_geom.geom_type == 'Polygon':
-        coords = [list(union_geom.exterior.coords)]
-    else:
-        coords = [list(poly.exterior.coords) for poly in union_geom.geoms]
+coords = load_boundary_coords(boundary_file, output_dir)
 
-ee_boundary = ee.Geometry.MultiPolygon(coords) if len(coords) > 1 else ee.Geometry.Polygon(coords[0])
+if len(coords) > 1:
+    ee_boundary = ee.Geometry.MultiPolygon(coords, proj='EPSG:4326', geodesic=False)
+else:
+    ee_boundary = ee.Geometry.Polygon(coords[0], proj='EPSG:4326', geodesic=False)
 print(f"✓ Boundary loaded")
 
 # Load existing datasets
@@ -64,8 +69,21 @@ print("\nLoading existing datasets...")
 historical_csv = output_dir / "archive" / "glc_fcs30d_historical_lulc_20251024_114642.csv"
 dynamic_csv = output_dir / "dynamic_world_lulc_january_2018_2025_20251026_153424.csv"
 
-df_historical = pd.read_csv(historical_csv)
-df_dynamic = pd.read_csv(dynamic_csv)
+def read_lulc_table(csv_path):
+    """Read a LULC CSV via a sibling Parquet copy, refreshed when the CSV is newer"""
+    parquet_path = csv_path.with_suffix('.parquet')
+    try:
+        if parquet_path.exists() and parquet_path.stat().st_mtime >= csv_path.stat().st_mtime:
+            return pd.read_parquet(parquet_path)
+        df = pd.read_csv(csv_path)
+        df.to_parquet(parquet_path, index=False)
+        return df
+    except ImportError:
+        # No parquet engine (pyarrow/fastparquet) installed
+        return pd.read_csv(csv_path)
+
+df_historical = read_lulc_table(historical_csv)
+df_dynamic = read_lulc_table(dynamic_csv)
 
 print(f"  Historical (GLC-FCS30D): {len(df_historical)} years")
 print(f"    Years: {sorted(df_historical['year'].unique().tolist())}")
@@ -88,10 +106,10 @@ df_dynamic_clean = df_dynamic_clean[historical_cols]
 df_historical_clean = df_historical[historical_cols].copy()
 
 # Use GLC-FCS30D for 1987-2015, Dynamic World for 2018-2025
-df_historical_filtered = df_historical_clean[df_historical_clean['year'] <= 2015].copy()
+df_historical_clean.drop(df_historical_clean.index[df_historical_clean['year'] > 2015], inplace=True)
 
 # Combine datasets
-combined_df = pd.concat([df_historical_filtered, df_dynamic_clean], ignore_index=True)
+combined_df = pd.concat([df_historical_clean, df_dynamic_clean], ignore_index=True)
 combined_df = combined_df.sort_values('year').reset_index(drop=True)
 
 print(f"\nCombined dataset:")
@@ -121,13 +139,49 @@ GLC_TO_DW_MAPPING = {
     180: 0  # Water
 }
 
+# GLC-FCS30D band per year: five-year composites b1-b3 cover 1985-1999,
+# annual maps b1, b2, ... cover 2000 onwards
+BAND_BY_YEAR = {
+    year: ((f'b{(year - 1985) // 5 + 1}', 'five_year') if year <= 1999
+           else (f'b{year - 2000 + 1}', 'annual'))
+    for year in range(1985, 2023)
+}
+
+# Constant array image indexed by the uint8 GLC-FCS30D code (unmapped codes
+# fall back to Bare, 7). A single arrayGet per pixel replaces remap's chain of
+# per-value comparisons, and every year shares this one graph node
+GLC_TO_DW_LUT = ee.Image(ee.Array([GLC_TO_DW_MAPPING.get(code, 7) for code in range(256)]))
+
 def remap_glc_to_dw(image):
     """Remap GLC-FCS30D classes to Dynamic World classes"""
-    return image.remap(
-        list(GLC_TO_DW_MAPPING.keys()),
-        list(GLC_TO_DW_MAPPING.values()),
-        defaultValue=7
-    )
+    return GLC_TO_DW_LUT.arrayGet(image.int())
+
+@lru_cache(maxsize=None)
+def build_lulc_image(year):
+    """Build the clipped LULC image for a year (memoized across export passes)
+
+    Returns (dataset_name, image) with Dynamic World class values in band 'lulc'.
+    """
+    if year <= 2015:
+        # GLC-FCS30D data
+        dataset_name = "GLC-FCS30D"
+        
+        band, collection_tag = BAND_BY_YEAR[year]
+        image_col = glc_fcs_five_year if collection_tag == 'five_year' else glc_fcs_annual
+        glc_image = image_col.select([band]).mosaic()
+        
+        lulc_image = remap_glc_to_dw(glc_image)
+        
+    else:
+        # Dynamic World data (January only)
+        dataset_name = "Dynamic World"
+        start_date = f'{year}-01-01'
+        end_date = f'{year}-01-31'
+        
+        dw_january = dw_collection.filterDate(start_date, end_date).filterBounds(ee_boundary)
+        lulc_image = dw_january.select('label').mode()
+    
+    return dataset_name, lulc_image.clip(ee_boundary).rename('lulc').byte()
 
 # Export configuration
 export_config = {
@@ -142,12 +196,30 @@ historical_years = [1987, 1992, 1997, 2000, 2005, 2010, 2015]
 dynamic_years = [2018, 2020, 2022, 2025]  # Key Dynamic World years
 all_export_years = historical_years + dynamic_years
 
-export_tasks = []
+# Tasks are queued per year and started together afterwards
+queued_tasks = []
+
+def queue_task(year, dataset_name, task_type, task):
+    """Record an unstarted export task with its metadata"""
+    queued_tasks.append({'year': year, 'dataset': dataset_name, 'type': task_type, 'task': task})
+
+def start_task(task, max_retries=5):
+    """Start an EE export task, backing off on transient (e.g. quota) errors"""
+    for attempt in range(max_retries):
+        try:
+            task.start()
+            return task.id
+        except Exception as e:
+            if attempt == max_retries - 1:
+                print(f"ERROR starting {task.config.get('description', 'task')}: {e}")
+                return None
+            time.sleep(2 ** attempt + random.uniform(0, 1))
 
 print(f"\n{'=' * 80}")
 print(f"EXPORTING RASTERS AND SHAPEFILES")
 print(f"{'=' * 80}")
 print(f"Years to export: {all_export_years}")
+print(f"Vector years: {sorted(VECTOR_YEARS & set(all_export_years))}")
 
 for year in all_export_years:
     print(f"\n{'=' * 80}")
@@ -155,33 +227,7 @@ for year in all_export_years:
     print(f"{'=' * 80}")
     
     try:
-        if year <= 2015:
-            # GLC-FCS30D data
-            dataset_name = "GLC-FCS30D"
-            
-            if year <= 1999:
-                if year <= 1989:
-                    band, period = 'b1', '1985-1989'
-                elif year <= 1994:
-                    band, period = 'b2', '1990-1994'
-                else:
-                    band, period = 'b3', '1995-1999'
-                glc_image = glc_fcs_five_year.select([band]).mosaic().clip(ee_boundary)
-            else:
-                band = f'b{year - 2000 + 1}'
-                period = str(year)
-                glc_image = glc_fcs_annual.select([band]).mosaic().clip(ee_boundary)
-            
-            lulc_image = remap_glc_to_dw(glc_image).rename('lulc').byte()
-            
-        else:
-            # Dynamic World data (January only)
-            dataset_name = "Dynamic World"
-            start_date = f'{year}-01-01'
-            end_date = f'{year}-01-31'
-            
-            dw_january = dw_collection.filterDate(start_date, end_date).filterBounds(ee_boundary)
-            lulc_image = dw_january.select('label').mode().clip(ee_boundary).rename('lulc').byte()
+        dataset_name, lulc_image = build_lulc_image(year)
         
         print(f"Dataset: {dataset_name}")
         
@@ -194,14 +240,7 @@ for year in all_export_years:
             fileNamePrefix=f'lulc_{year}_{dataset_name.lower().replace(" ", "_")}',
             **export_config
         )
-        task_raster.start()
-        export_tasks.append({
-            'year': year,
-            'dataset': dataset_name,
-            'type': 'full_lulc',
-            'task_id': task_raster.id
-        })
-        print(f"    ✓ Task ID: {task_raster.id}")
+        queue_task(year, dataset_name, 'full_lulc', task_raster)
         
         # Export tree cover layer
         print(f"  Exporting tree cover layer...")
@@ -213,14 +252,7 @@ for year in all_export_years:
             fileNamePrefix=f'trees_{year}_{dataset_name.lower().replace(" ", "_")}',
             **export_config
         )
-        task_tree.start()
-        export_tasks.append({
-            'year': year,
-            'dataset': dataset_name,
-            'type': 'trees',
-            'task_id': task_tree.id
-        })
-        print(f"    ✓ Task ID: {task_tree.id}")
+        queue_task(year, dataset_name, 'trees', task_tree)
         
         # Export built area layer
         print(f"  Exporting built area layer...")
@@ -232,53 +264,57 @@ for year in all_export_years:
             fileNamePrefix=f'built_{year}_{dataset_name.lower().replace(" ", "_")}',
             **export_config
         )
-        task_built.start()
-        export_tasks.append({
-            'year': year,
-            'dataset': dataset_name,
-            'type': 'built',
-            'task_id': task_built.id
-        })
-        print(f"    ✓ Task ID: {task_built.id}")
+        queue_task(year, dataset_name, 'built', task_built)
         
-        # Export shapefiles for key classes
-        for class_id, class_name in [(1, 'Trees'), (6, 'Built')]:
-            print(f"  Exporting {class_name.lower()} shapefile...")
-            
-            class_mask = lulc_image.eq(class_id)
-            vectors = class_mask.reduceToVectors(
-                geometry=ee_boundary,
-                scale=100,  # 100m for vectors
-                maxPixels=1e10,
-                geometryType='polygon'
-            )
-            
-            task_vector = ee.batch.Export.table.toDrive(
-                collection=vectors,
-                description=f'{class_name}_{year}_Vector',
-                folder='Western_Ghats_Shapefiles',
-                fileNamePrefix=f'{class_name.lower()}_{year}',
-                fileFormat='SHP'
-            )
-            task_vector.start()
-            export_tasks.append({
-                'year': year,
-                'dataset': dataset_name,
-                'type': f'{class_name.lower()}_shapefile',
-                'task_id': task_vector.id
-            })
-            print(f"    ✓ Task ID: {task_vector.id}")
+        if year not in VECTOR_YEARS:
+            print(f"✓ Queued {year} - {len([t for t in queued_tasks if t['year'] == year])} tasks (rasters only)")
+            continue
         
-        print(f"✓ Completed {year} - {len([t for t in export_tasks if t['year'] == year])} tasks submitted")
+        # Export tree and built polygons together, one feature collection per
+        # year with the LULC class stored in each feature's 'class' property
+        print(f"  Exporting trees/built vectors...")
+        key_classes = lulc_image.updateMask(lulc_image.eq(1).Or(lulc_image.eq(6)))
+        vectors = key_classes.reduceToVectors(
+            geometry=ee_boundary,
+            scale=100,  # 100m for vectors
+            maxPixels=1e10,
+            geometryType='polygon',
+            labelProperty='class'
+        )
+        
+        task_vector = ee.batch.Export.table.toDrive(
+            collection=vectors,
+            description=f'Vectors_{year}',
+            folder='Western_Ghats_Shapefiles',
+            fileNamePrefix=f'lulc_vectors_{year}',
+            fileFormat='GeoJSON'
+        )
+        queue_task(year, dataset_name, 'vectors', task_vector)
+        
+        print(f"✓ Queued {year} - {len([t for t in queued_tasks if t['year'] == year])} tasks")
         
     except Exception as e:
         print(f"ERROR processing {year}: {e}")
         continue
 
+# Submitting a task is a synchronous round-trip to the EE API; start them
+# concurrently, the batch backend schedules them regardless
+print(f"\nStarting {len(queued_tasks)} export tasks...")
+with ThreadPoolExecutor(max_workers=16) as executor:
+    task_ids = list(executor.map(start_task, [t['task'] for t in queued_tasks]))
+
+export_tasks = [
+    {'year': t['year'], 'dataset': t['dataset'], 'type': t['type'], 'task_id': task_id}
+    for t, task_id in zip(queued_tasks, task_ids)
+    if task_id is not None
+]
+print(f"✓ Started {len(export_tasks)} of {len(queued_tasks)} tasks")
+
 # Save export metadata
 export_metadata = {
     'created': datetime.now().isoformat(),
     'years_exported': all_export_years,
+    'vector_years': sorted(VECTOR_YEARS & set(all_export_years)),
     'historical_years': historical_years,
     'dynamic_world_years': dynamic_years,
     'total_tasks': len(export_tasks),
@@ -286,9 +322,9 @@ export_metadata = {
         'full_lulc': len([t for t in export_tasks if t['type'] == 'full_lulc']),
         'trees_raster': len([t for t in export_tasks if t['type'] == 'trees']),
         'built_raster': len([t for t in export_tasks if t['type'] == 'built']),
-        'trees_shapefile': len([t for t in export_tasks if t['type'] == 'trees_shapefile']),
-        'built_shapefile': len([t for t in export_tasks if t['type'] == 'built_shapefile'])
+        'vectors': len([t for t in export_tasks if t['type'] == 'vectors'])
     },
+    'vector_classes': {'1': 'Trees', '6': 'Built'},
     'tasks': export_tasks,
     'combined_csv': str(combined_csv),
     'google_drive_folders': {
@@ -298,8 +334,7 @@ export_metadata = {
 }
 
 metadata_file = geospatial_dir / f"complete_export_metadata_{timestamp}.json"
-with open(metadata_file, 'w') as f:
-    json.dump(export_metadata, f, indent=2)
+write_json(metadata_file, export_metadata)
 
 print(f"\n{'=' * 80}")
 print(f"EXPORT SUMMARY")
@@ -308,13 +343,15 @@ print(f"Total tasks submitted: {len(export_tasks)}")
 print(f"  Full LULC rasters: {export_metadata['tasks_by_type']['full_lulc']}")
 print(f"  Tree cover rasters: {export_metadata['tasks_by_type']['trees_raster']}")
 print(f"  Built area rasters: {export_metadata['tasks_by_type']['built_raster']}")
-print(f"  Tree shapefiles: {export_metadata['tasks_by_type']['trees_shapefile']}")
-print(f"  Built shapefiles: {export_metadata['tasks_by_type']['built_shapefile']}")
+print(f"  Tree/built vectors: {export_metadata['tasks_by_type']['vectors']}")
 print(f"\nMetadata saved: {metadata_file}")
 print(f"Combined CSV saved: {combined_csv}")
 print(f"\nGoogle Drive folders:")
 print(f"  - Western_Ghats_Complete_Analysis (rasters)")
-print(f"  - Western_Ghats_Shapefiles (vectors)")
+print(f"  - Western_Ghats_Shapefiles (vectors, GeoJSON)")
+print(f"\nConvert downloaded vectors to GeoPackage with pyogrio, e.g.:")
+print(f"  pyogrio.write_dataframe(gpd.read_file('lulc_vectors_2025.geojson', engine='pyogrio'),")
+print(f"                          'lulc_vectors_2025.gpkg', driver='GPKG')")
 print(f"\nMonitor tasks: https://code.earthengine.google.com/tasks")
 
 print(f"\n{'=' * 80}")
@@ -12,6 +12,19 @@ from pathlib import Path
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+def to_js_literal(obj):
+    """Serialize obj for the page's inline <script>, using orjson when available"""
+    if HAS_ORJSON:
+        # Shortest round-trip float repr keeps the embedded records compact
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj)
+
 print("=" * 80)
 print("CREATING LULC STATISTICS DASHBOARD")
 print("=" * 80)
@@ -31,11 +44,26 @@ print(f"Loaded {len(df)} years of data")
 print(f"  Years: {sorted(df['year'].unique().tolist())}")
 print(f"  Datasets: {df['dataset'].unique().tolist()}")
 
-# Calculate statistics
-df['total_computed'] = df[['Water', 'Trees', 'Grass', 'Flooded Vegetation', 
-                           'Crops', 'Shrub and Scrub', 'Built', 'Bare', 'Snow and ice']].sum(axis=1)
+# Class columns, named the way the dashboard JavaScript reads them
+CLASS_COLS = ['Water', 'Trees', 'Grass', 'Flooded vegetation', 'Crops',
+              'Shrub and scrub', 'Built', 'Bare', 'Snow and ice']
+df = df.rename(columns={
+    'Flooded Vegetation': 'Flooded vegetation',
+    'Shrub and Scrub': 'Shrub and scrub'
+})
+
+# Calculate statistics on one contiguous years x classes array
+class_areas = df[CLASS_COLS].to_numpy(dtype=np.float64)
+class_totals = class_areas.sum(axis=1)
+df['total_computed'] = class_totals
 
-area_mean = df['total_computed'].mean()
+# Class shares for the year table, all years and classes in one array divide.
+# Rounded to the 2 decimals the table displays, which also keeps the JSON short
+class_pct = np.round(class_areas / class_totals[:, None] * 100, 2)
+for class_name, pct_values in zip(CLASS_COLS, class_pct.T):
+    df[f'{class_name}_percent'] = pct_values
+
+area_mean = class_totals.mean()
 trees_first = df.iloc[0]['Trees']
 trees_last = df.iloc[-1]['Trees']
 trees_change = ((trees_last - trees_first) / trees_first) * 100
@@ -57,6 +85,12 @@ LULC_COLORS = {
     'Snow and ice': '#B39FE1'
 }
 
+# Year selector options; the value is the index into lulcData
+year_options = "".join(
+    f'<option value="{i}">{year} - {dataset}</option>'
+    for i, (year, dataset) in enumerate(zip(df['year'].astype(int).to_numpy(), df['dataset'].to_numpy()))
+)
+
 # Create the HTML
 html_content = f"""
 <!DOCTYPE html>
@@ -332,7 +366,7 @@ html_content = f"""
             <div class="control-group">
                 <label for="year-select">Select Year to View Detailed Statistics:</label>
                 <select id="year-select" onchange="updateYearDetails()">
-                    {"".join([f'<option value="{i}">{int(row["year"])} - {row["dataset"]}</option>' for i, row in df.iterrows()])}
+                    {year_options}
                 </select>
             </div>
         </div>
@@ -380,11 +414,11 @@ html_content = f"""
     
     <script>
         // Data from Python
-        const lulcData = {json.dumps(df.to_dict('records'))};
-        const colors = {json.dumps(LULC_COLORS)};
+        const lulcData = {to_js_literal(df.to_dict('records'))};
+        const colors = {to_js_literal(LULC_COLORS)};
         
-        // Update year details
-        function updateYearDetails() {{
+        // Render the details table for the selected year
+        function renderYearDetails() {{
             const select = document.getElementById('year-select');
             const idx = parseInt(select.value);
             const data = lulcData[idx];
@@ -465,6 +499,18 @@ html_content = f"""
             document.getElementById('year-details').innerHTML = detailsHtml;
         }}
         
+        // Holding an arrow key on the select fires change events faster than
+        // the table can be rebuilt, so render at most once per frame; the
+        // render reads the select itself, so the latest year always wins
+        let pendingFrame = null;
+        function updateYearDetails() {{
+            if (pendingFrame !== null) return;
+            pendingFrame = requestAnimationFrame(() => {{
+                pendingFrame = null;
+                renderYearDetails();
+            }});
+        }}
+        
         // Create charts
         const years = lulcData.map(d => d.year);
         
@@ -8,11 +8,12 @@ Optimized Tree Cover and Built Area Analysis for Western Ghats (2018-2025)
 """
 
 import ee
-import geopandas as gpd
 import pandas as pd
 import numpy as np
 from pathlib import Path
-import json
+from _load_boundary import load_boundary_coords
+from _json_io import write_json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
@@ -38,28 +39,16 @@ geospatial_dir.mkdir(exist_ok=True)
 # Load boundary
 print("\nLoading Western Ghats boundary...")
 boundary_file = output_dir / "western_ghats_boundary_20250928_203521.geojson"
-gdf = gpd.read_file(boundary_file)
-gdf = gdf.to_crs(epsg=4326)
-gdf['geometry'] = gdf['geometry'].buffer(0)
+coords = load_boundary_coords(boundary_file, output_dir)
 
-# Convert to Earth Engine geometry
-if len(gdf) == 1:
-    geom = gdf.geometry.iloc[0]
-    if geom.geom_type == 'Polygon':
-        coords = [list(geom.exterior.coords)]
-    elif geom.geom_type == 'MultiPolygon':
-        coords = [list(poly.exterior.coords) for poly in geom.geoms]
-    else:
-        coords = [list(geom.exterior.coords)]
+if len(coords) > 1:
+    ee_boundary = ee.Geometry.MultiPolygon(coords, proj='EPSG:4326', geodesic=False)
 else:
-    union_geom = gdf.geometry.union_all()
-    if union_geom.geom_type == 'Polygon':
-        coords = [list(union_geom.exterior.coords)]
-    else:
-        coords = [list(poly.exterior.coords) for poly in union_geom.geoms]
+    ee_boundary = ee.Geometry.Polygon(coords[0], proj='EPSG:4326', geodesic=False)
+print(f"✓ Boundary loaded: {len(coords)} polygon part(s)")
 
-ee_boundary = ee.Geometry.MultiPolygon(coords) if len(coords) > 1 else ee.Geometry.Polygon(coords[0])
-print(f"✓ Boundary loaded: {gdf.geometry.area.sum() / 1e6:.2f} km²")
+# ~25 km tiles covering the boundary, used for the per-class area reductions
+boundary_tiles = ee_boundary.coveringGrid(ee.Projection('EPSG:4326'), 25000)
 
 # Dynamic World collection
 dw_collection = ee.ImageCollection("GOOGLE/DYNAMICWORLD/V1")
@@ -89,67 +78,85 @@ print(f"Dataset: Dynamic World V1 (10m resolution)")
 print(f"Primary focus: Tree cover and built-up area classes")
 print(f"Regional optimization: Snow/ice suppressed (tropical climate)")
 
-# Storage for results
-all_results = []
-export_tasks = []
+def process_year(year):
+    """Compute class areas and start raster exports for one January
+    
+    Returns (year_data, tasks, log); year_data is None when no imagery exists
+    or the year failed. Progress lines are buffered in log so concurrent years
+    print cleanly. An EE error only ends its own year, and the exports it had
+    already started are still returned so their IDs reach the task metadata.
+    """
+    log = [f"\n{'=' * 80}", f"PROCESSING YEAR {year}", f"{'=' * 80}"]
+    tasks = []
+    try:
+        return run_year(year, tasks, log), tasks, log
+    except Exception as e:
+        log.append(f"ERROR: {year} failed: {e}")
+        return None, tasks, log
 
-# Process each year
-for year in years:
-    print(f"\n{'=' * 80}")
-    print(f"PROCESSING YEAR {year}")
-    print(f"{'=' * 80}")
-    
+def run_year(year, tasks, log):
+    """Body of process_year; appends to tasks and log as it goes"""
     # January only to avoid seasonal variations
     start_date = f'{year}-01-01'
     end_date = f'{year}-01-31'
     
-    print(f"\nFiltering Dynamic World: {start_date} to {end_date}")
+    log.append(f"\nFiltering Dynamic World: {start_date} to {end_date}")
     dw_january = dw_collection.filterDate(start_date, end_date).filterBounds(ee_boundary)
     
     # Check image count
     image_count = dw_january.size().getInfo()
-    print(f"Available images: {image_count}")
+    log.append(f"Available images: {image_count}")
     
     if image_count == 0:
-        print(f"WARNING: No images available for January {year}")
-        continue
+        log.append(f"WARNING: No images available for January {year}")
+        return None
     
     # Get mode classification for January
-    print(f"Computing mode classification for January {year}...")
+    log.append(f"Computing mode classification for January {year}...")
     lulc_mode = dw_january.select('label').mode().clip(ee_boundary)
     
     # Calculate area for each class
-    print(f"Calculating areas by class...")
+    log.append(f"Calculating areas by class...")
     year_data = {'year': year, 'dataset': 'Dynamic World', 'month': 'January'}
     
-    for class_id, class_name in DW_CLASSES.items():
-        print(f"  Processing {class_name} (class {class_id})...", end=' ')
-        
-        # Create binary mask for this class
-        class_mask = lulc_mode.eq(class_id)
-        
-        # Calculate area
-        area_image = class_mask.multiply(ee.Image.pixelArea())
-        
-        # Reduce with increased maxPixels and bestEffort
-        area_stats = area_image.reduceRegion(
-            reducer=ee.Reducer.sum(),
+    # One grouped reduction per ~25 km tile at native 10 m resolution (no
+    # bestEffort downsampling); tiles run in parallel on the EE backend and
+    # their per-class sums come back in a single request. tileScale splits
+    # each tile's computation further to stay inside EE's per-request memory
+    # Band 0 is the class label (group key), band 1 the pixel area being summed
+    area_image = lulc_mode.rename('cls').addBands(ee.Image.pixelArea().rename('a'))
+    try:
+        tile_groups = area_image.reduceRegions(
+            collection=boundary_tiles,
+            reducer=ee.Reducer.sum().group(groupField=0, groupName='class'),
+            scale=10,
+            tileScale=4
+        ).aggregate_array('groups').getInfo()
+    except ee.EEException as e:
+        # Timeout or memory limit at 10 m: fall back to the 30 m whole-boundary sum
+        log.append(f"WARNING: 10 m tiled reduction failed ({e}); falling back to 30 m")
+        tile_groups = [area_image.reduceRegion(
+            reducer=ee.Reducer.sum().group(groupField=0, groupName='class'),
             geometry=ee_boundary,
-            scale=30,  # Use 30m for faster processing
+            scale=30,
             maxPixels=1e10,
-            bestEffort=True
-        )
-        
-        area_m2 = area_stats.get('label').getInfo() or 0
-        area_km2 = area_m2 / 1e6
-        
-        year_data[class_name] = area_km2
-        print(f"{area_km2:.2f} km²")
+            bestEffort=True,
+            tileScale=4
+        ).get('groups').getInfo()]
+    
+    class_areas_m2 = {}
+    for groups in tile_groups:
+        for group in groups:
+            class_id = int(group['class'])
+            class_areas_m2[class_id] = class_areas_m2.get(class_id, 0) + group['sum']
     
-    all_results.append(year_data)
+    for class_id, class_name in DW_CLASSES.items():
+        area_km2 = class_areas_m2.get(class_id, 0) / 1e6
+        year_data[class_name] = area_km2
+        log.append(f"  {class_name} (class {class_id}): {area_km2:.2f} km²")
     
     # Export tree cover raster for QGIS visualization
-    print(f"\nExporting tree cover raster for {year}...")
+    log.append(f"\nExporting tree cover raster for {year}...")
     
     # Create tree cover binary mask (class 1 = Trees)
     tree_mask = lulc_mode.eq(1).selfMask()
@@ -167,17 +174,17 @@ for year in years:
     )
     
     export_task_tree.start()
-    export_tasks.append({
+    tasks.append({
         'year': year,
         'task_id': export_task_tree.id,
         'description': f'Tree_Cover_{year}_January',
         'type': 'tree_cover_raster'
     })
     
-    print(f"✓ Tree cover export task started: {export_task_tree.id}")
+    log.append(f"✓ Tree cover export task started: {export_task_tree.id}")
     
     # Export built-up area raster for QGIS visualization
-    print(f"Exporting built-up area raster for {year}...")
+    log.append(f"Exporting built-up area raster for {year}...")
     
     # Create built area binary mask (class 6 = Built)
     built_mask = lulc_mode.eq(6).selfMask()
@@ -195,17 +202,17 @@ for year in years:
     )
     
     export_task_built.start()
-    export_tasks.append({
+    tasks.append({
         'year': year,
         'task_id': export_task_built.id,
         'description': f'Built_Area_{year}_January',
         'type': 'built_area_raster'
     })
     
-    print(f"✓ Built area export task started: {export_task_built.id}")
+    log.append(f"✓ Built area export task started: {export_task_built.id}")
     
     # Also export full LULC classification
-    print(f"Exporting full LULC raster for {year}...")
+    log.append(f"Exporting full LULC raster for {year}...")
     
     export_task_full = ee.batch.Export.image.toDrive(
         image=lulc_mode.byte(),
@@ -220,14 +227,31 @@ for year in years:
     )
     
     export_task_full.start()
-    export_tasks.append({
+    tasks.append({
         'year': year,
         'task_id': export_task_full.id,
         'description': f'LULC_{year}_January_DW',
         'type': 'full_lulc_raster'
     })
     
-    print(f"✓ Export task started: {export_task_full.id}")
+    log.append(f"✓ Export task started: {export_task_full.id}")
+    
+    return year_data
+
+# Years only share read-only EE objects, so their requests can overlap
+YEAR_WORKERS = 4
+
+# Storage for results
+all_results = []
+export_tasks = []
+
+# Process years concurrently; results come back in year order
+with ThreadPoolExecutor(max_workers=YEAR_WORKERS) as executor:
+    for year_data, tasks, log in executor.map(process_year, years):
+        print('\n'.join(log))
+        if year_data is not None:
+            all_results.append(year_data)
+        export_tasks.extend(tasks)
 
 # Save results to CSV
 if all_results:
@@ -248,15 +272,18 @@ if all_results:
     print(f"Total years processed: {len(results_df)}")
     print(f"Year range: {results_df['year'].min()} - {results_df['year'].max()}")
     
-    # Summary statistics
+    # Summary statistics (percentages relative to the first year's total area)
+    years_processed = results_df['year'].astype(int).to_numpy()
+    baseline_total_km2 = results_df.iloc[0][['Water', 'Trees', 'Grass', 'Flooded Vegetation',
+                                             'Crops', 'Shrub and Scrub', 'Built', 'Bare']].sum()
+    
     print(f"\n{'=' * 80}")
     print(f"TREE COVER SUMMARY")
     print(f"{'=' * 80}")
     
-    for idx, row in results_df.iterrows():
-        tree_pct = (row['Trees'] / results_df.iloc[0][['Water', 'Trees', 'Grass', 'Flooded Vegetation', 
-                                                         'Crops', 'Shrub and Scrub', 'Built', 'Bare']].sum()) * 100
-        print(f"  {int(row['year'])}: {row['Trees']:,.2f} km² ({tree_pct:.1f}%)")
+    for year, area in zip(years_processed, results_df['Trees'].to_numpy()):
+        tree_pct = area / baseline_total_km2 * 100
+        print(f"  {year}: {area:,.2f} km² ({tree_pct:.1f}%)")
     
     # Calculate tree cover change
     if len(results_df) >= 2:
@@ -275,10 +302,9 @@ if all_results:
     print(f"BUILT-UP AREA SUMMARY")
     print(f"{'=' * 80}")
     
-    for idx, row in results_df.iterrows():
-        built_pct = (row['Built'] / results_df.iloc[0][['Water', 'Trees', 'Grass', 'Flooded Vegetation', 
-                                                          'Crops', 'Shrub and Scrub', 'Built', 'Bare']].sum()) * 100
-        print(f"  {int(row['year'])}: {row['Built']:,.2f} km² ({built_pct:.1f}%)")
+    for year, area in zip(years_processed, results_df['Built'].to_numpy()):
+        built_pct = area / baseline_total_km2 * 100
+        print(f"  {year}: {area:,.2f} km² ({built_pct:.1f}%)")
     
     # Calculate built area change
     if len(results_df) >= 2:
@@ -311,8 +337,7 @@ if all_results:
     }
     
     metadata_file = geospatial_dir / f"export_metadata_{timestamp}.json"
-    with open(metadata_file, 'w') as f:
-        json.dump(export_metadata, f, indent=2)
+    write_json(metadata_file, export_metadata)
     
     print(f"\n{'=' * 80}")
     print(f"EXPORT TASKS SUBMITTED")
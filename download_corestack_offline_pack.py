@@ -34,21 +34,29 @@ Usage
 Notes
 - Port 8443 must be reachable at download time. After download, you are offline.
 - GeoTIFF rasters won’t render directly in Google Earth Pro; use QGIS offline.
+- GetCapabilities XML is cached under .capabilities_cache/ for 24h
+  (--capabilities-max-age 0 forces a refetch when new layers are published).
 """
 
 from __future__ import annotations
 
 import argparse
 import csv
+import hashlib
+import os
+import random
 import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Iterable
 
 import requests
 from requests import Response
-from requests.exceptions import ChunkedEncodingError, ConnectionError, ReadTimeout
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ChunkedEncodingError, ConnectionError, HTTPError, ReadTimeout
 
 
 WORKSPACE_ROOT = Path(__file__).resolve().parent
@@ -58,6 +66,9 @@ DEFAULT_GEOSERVER_BASE = "https://geoserver.core-stack.org:8443/geoserver"
 DEFAULT_WFS_VERSION = "1.0.0"
 DEFAULT_WCS_VERSION = "2.0.1"
 
+# Throttling / transient server errors worth retrying; other 4xx fail at once
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
 
 @dataclass(frozen=True)
 class DownloadItem:
@@ -80,6 +91,23 @@ def _http_get_text(url: str, *, timeout: int, verify_tls: bool) -> str:
     return r.text
 
 
+def _cached_capabilities(
+    url: str, cache_dir: Path, *, max_age_h: float, timeout: int, verify_tls: bool
+) -> str:
+    """Return GetCapabilities XML, reusing a copy fetched within max_age_h hours."""
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    path = cache_dir / f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}.xml"
+    if max_age_h > 0 and path.exists() and time.time() - path.stat().st_mtime < max_age_h * 3600:
+        return path.read_text(encoding="utf-8")
+
+    xml = _http_get_text(url, timeout=timeout, verify_tls=verify_tls)
+    # Write-then-rename so an interrupted run never leaves a truncated cache
+    tmp = path.with_suffix(".xml.part")
+    tmp.write_text(xml, encoding="utf-8")
+    os.replace(tmp, path)
+    return xml
+
+
 def _stream_download(url: str, out_path: Path, *, timeout: int, verify_tls: bool) -> int:
     out_path.parent.mkdir(parents=True, exist_ok=True)
     tmp = out_path.with_suffix(out_path.suffix + ".part")
@@ -111,7 +139,9 @@ def _download_with_retries(
     """Return (ok, bytes, error_message)."""
 
     last_err = ""
+    retry_after = 0.0
     for attempt in range(1, max_attempts + 1):
+        retryable = True
         try:
             out_path.parent.mkdir(parents=True, exist_ok=True)
             tmp = out_path.with_suffix(out_path.suffix + ".part")
@@ -131,6 +161,12 @@ def _download_with_retries(
                         n += len(chunk)
             tmp.replace(out_path)
             return True, n, ""
+        except HTTPError as e:
+            last_err = f"{type(e).__name__}: {e}"
+            resp = e.response
+            retryable = resp is not None and resp.status_code in RETRY_STATUS
+            header = resp.headers.get("Retry-After", "") if resp is not None else ""
+            retry_after = float(header) if header.isdigit() else 0.0
         except (ChunkedEncodingError, ConnectionError, ReadTimeout) as e:
             last_err = f"{type(e).__name__}: {e}"
         except Exception as e:
@@ -144,9 +180,13 @@ def _download_with_retries(
         except Exception:
             pass
 
+        if not retryable:
+            break
         if attempt < max_attempts:
-            sleep_s = backoff_s * (2 ** (attempt - 1))
-            time.sleep(min(60.0, sleep_s))
+            # Jitter keeps parallel workers from retrying in lockstep
+            sleep_s = backoff_s * (2 ** (attempt - 1)) + random.uniform(0, backoff_s)
+            time.sleep(min(60.0, max(sleep_s, retry_after)))
+            retry_after = 0.0
 
     return False, 0, last_err
 
@@ -321,6 +361,24 @@ def main() -> None:
         default=3600,
         help="Per-request timeout in seconds (rasters can be slow).",
     )
+    parser.add_argument(
+        "--capabilities-max-age",
+        type=float,
+        default=24.0,
+        help="Reuse cached GetCapabilities responses younger than this many hours (0 = always refetch).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Concurrent downloads (GeoServer time dominates; 1 = serial).",
+    )
+    parser.add_argument(
+        "--raster-workers",
+        type=int,
+        default=2,
+        help="Cap on concurrent WCS GeoTIFF downloads within --workers (rasters load GeoServer most).",
+    )
 
     args = parser.parse_args()
 
@@ -331,13 +389,19 @@ def main() -> None:
     pack_dir.mkdir(parents=True, exist_ok=True)
 
     wfs_caps_url = f"{base}/ows?service=WFS&version={DEFAULT_WFS_VERSION}&request=GetCapabilities"
-    wfs_xml = _http_get_text(wfs_caps_url, timeout=240, verify_tls=bool(args.verify_tls))
+    caps_dir = OUT_ROOT / ".capabilities_cache"
+    caps_age = float(args.capabilities_max_age)
+    wfs_xml = _cached_capabilities(
+        wfs_caps_url, caps_dir, max_age_h=caps_age, timeout=240, verify_tls=bool(args.verify_tls)
+    )
     typenames = _parse_wfs_typenames(wfs_xml)
 
     coverage_ids: list[str] = []
     if args.include_rasters:
         wcs_caps_url = f"{base}/ows?service=WCS&version={DEFAULT_WCS_VERSION}&request=GetCapabilities"
-        wcs_xml = _http_get_text(wcs_caps_url, timeout=240, verify_tls=bool(args.verify_tls))
+        wcs_xml = _cached_capabilities(
+            wcs_caps_url, caps_dir, max_age_h=caps_age, timeout=240, verify_tls=bool(args.verify_tls)
+        )
         coverage_ids = _parse_wcs_coverage_ids(wcs_xml)
 
     items = _build_items_for_patterns(
@@ -358,45 +422,69 @@ def main() -> None:
         print(f"Discovered items: {len(items)}")
         return
 
+    workers = max(1, int(args.workers))
     session = requests.Session()
+    # One pooled connection per worker so threads don't queue on the adapter
+    adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
 
     downloaded = 0
     skipped = 0
     failed = 0
 
-    updated_items: list[DownloadItem] = []
+    # Vectors can use every worker; only this many rasters render at once
+    raster_slots = threading.Semaphore(max(1, int(args.raster_workers)))
+
+    def fetch(it: DownloadItem) -> tuple[bool, int, str]:
+        def download() -> tuple[bool, int, str]:
+            return _download_with_retries(
+                session=session,
+                url=it.url,
+                out_path=it.out_path,
+                timeout=int(args.timeout),
+                verify_tls=bool(args.verify_tls),
+                max_attempts=int(args.max_attempts),
+                backoff_s=2.0,
+            )
+
+        if it.kind == "raster_geotiff":
+            with raster_slots:
+                result = download()
+        else:
+            result = download()
+        if args.sleep:
+            time.sleep(float(args.sleep))
+        return result
+
+    pending: list[DownloadItem] = []
     for it in items:
         exists_ok = it.out_path.exists() and it.out_path.stat().st_size > 0
-        if exists_ok and args.only_missing:
-            skipped += 1
-            updated_items.append(it)
-            continue
-
         if exists_ok:
             skipped += 1
-            updated_items.append(it)
-            continue
-
-        ok, n, err = _download_with_retries(
-            session=session,
-            url=it.url,
-            out_path=it.out_path,
-            timeout=int(args.timeout),
-            verify_tls=bool(args.verify_tls),
-            max_attempts=int(args.max_attempts),
-            backoff_s=2.0,
-        )
-        if ok:
-            downloaded += 1
-            updated_items.append(DownloadItem(it.kind, it.name, it.url, it.out_path, ""))
-            print(f"Downloaded {it.kind}: {it.name} ({n/1024/1024:.2f} MB)")
         else:
-            failed += 1
-            updated_items.append(DownloadItem(it.kind, it.name, it.url, it.out_path, err))
-            print(f"FAILED {it.kind}: {it.name} :: {err}")
+            pending.append(it)
+
+    # Downloads are network-bound, so threads overlap the server round-trips;
+    # map() yields results in item order for the manifest
+    results: dict[DownloadItem, tuple[bool, int, str]] = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for it, (ok, n, err) in zip(pending, pool.map(fetch, pending)):
+            results[it] = (ok, n, err)
+            if ok:
+                downloaded += 1
+                print(f"Downloaded {it.kind}: {it.name} ({n/1024/1024:.2f} MB)")
+            else:
+                failed += 1
+                print(f"FAILED {it.kind}: {it.name} :: {err}")
 
-        if args.sleep:
-            time.sleep(float(args.sleep))
+    updated_items: list[DownloadItem] = []
+    for it in items:
+        if it not in results:
+            updated_items.append(it)
+            continue
+        ok, _, err = results[it]
+        updated_items.append(DownloadItem(it.kind, it.name, it.url, it.out_path, "" if ok else err))
 
     _write_manifest(pack_dir, updated_items)
 
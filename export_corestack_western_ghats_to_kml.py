@@ -37,6 +37,7 @@ import os
 import re
 import time
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Iterable
 
@@ -179,39 +180,61 @@ def _read_user_points(points_csv: str | None) -> list[tuple[float, float, str]]:
             f"Points CSV must have columns lat, lon (optional: name). Got: {list(df.columns)}"
         )
 
-    out: list[tuple[float, float, str]] = []
-    for _, row in df.iterrows():
-        lat = float(row["lat"])
-        lon = float(row["lon"])
-        name = str(row.get("name") or f"Point {lat}, {lon}")
-        out.append((lat, lon, name))
-    return out
+    lat = df["lat"].astype(float)
+    lon = df["lon"].astype(float)
+    missing = (lat.isna() | lon.isna()).to_numpy().nonzero()[0]
+    if len(missing):
+        raise RuntimeError(f"Points CSV has blank lat/lon on data rows: {(missing + 1).tolist()}")
 
+    default_names = "Point " + lat.astype(str) + ", " + lon.astype(str)
+    if "name" in df.columns:
+        names = df["name"].fillna("").astype(str)
+        names = names.where(names != "", default_names)
+    else:
+        names = default_names
+    return list(zip(lat.tolist(), lon.tolist(), names.tolist()))
 
-def _local_admin_from_2011_districts(lat: float, lon: float) -> dict[str, str]:
-    """Best-effort local district lookup (2011 Census districts).
 
-    Returns empty dict if geopandas is unavailable or point is outside polygons.
-    """
+@lru_cache(maxsize=1)
+def _load_2011_districts() -> Any:
+    """Read, reproject and repair the 2011 districts once per run (None if unavailable)."""
 
     try:
         import geopandas as gpd
-        from shapely.geometry import Point
+        from shapely import make_valid
     except Exception:
-        return {}
+        return None
 
     shp = WORKSPACE_ROOT / "district_boundaries" / "2011_Dist.shp"
     if not shp.exists():
-        return {}
+        return None
 
     try:
         gdf = gpd.read_file(shp)
         if gdf.crs is None or str(gdf.crs).upper() != "EPSG:4326":
             gdf = gdf.to_crs("EPSG:4326")
+        gdf["geometry"] = make_valid(gdf.geometry.to_numpy())
+        gdf.sindex  # build the spatial index up front; reused for every point
+        return gdf
+    except Exception:
+        return None
+
+
+def _local_admin_from_2011_districts(lat: float, lon: float) -> dict[str, str]:
+    """Best-effort local district lookup (2011 Census districts).
+
+    Returns empty dict if geopandas is unavailable or point is outside polygons.
+    """
+
+    gdf = _load_2011_districts()
+    if gdf is None:
+        return {}
+
+    try:
+        from shapely.geometry import Point
+
         p = Point(lon, lat)
-        hit = gdf[gdf.contains(p)]
-        if len(hit) == 0:
-            hit = gdf[gdf.geometry.buffer(0).contains(p)]
+        hit = gdf.iloc[gdf.sindex.query(p, predicate="within")]
         if len(hit) == 0:
             return {}
         row = hit.iloc[0]
@@ -231,10 +254,9 @@ def read_wg_district_set() -> set[tuple[str, str]]:
 
     df = pd.read_csv(WG_DISTRICTS_CSV)
     # columns in this workspace: state, district, state_corestack, district_corestack
-    out: set[tuple[str, str]] = set()
-    for _, row in df.iterrows():
-        out.add((str(row["state"]).strip().lower(), str(row["district"]).strip().lower()))
-    return out
+    states = df["state"].astype(str).str.strip().str.lower()
+    districts = df["district"].astype(str).str.strip().str.lower()
+    return set(zip(states, districts))
 
 
 def write_kml(layer_rows: list[dict[str, Any]], point_rows: list[dict[str, Any]]) -> None:
@@ -6,33 +6,63 @@ Research Question: Is cropping intensity a risk factor for old-growth forests?
 Focus: Shade-grown agroforestry vs. intensive cropping impacts
 
 Created: December 14, 2024
-NOTE: Requires config.py file with CORE_STACK_API_KEY defined
+NOTE: Requires config.py file with CORE_STACK_API_KEY defined for live API calls.
+      Set GHATY_OFFLINE=1 to rerun from previously cached API responses instead.
 """
 
 import requests
 import pandas as pd
 import numpy as np
 import json
+import os
+import random
+import sqlite3
+import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from functools import lru_cache
 from pathlib import Path
+from urllib.parse import urlencode
 import warnings
 warnings.filterwarnings('ignore')
 
-# Import API key from config
+# With pyarrow, the grid table is memory-mapped from Feather and time series
+# are written as Parquet (smaller files, typed dates, no CSV re-parse on load);
+# otherwise fall back to plain CSV.
 try:
-    from config import CORE_STACK_API_KEY, CORE_STACK_BASE_URL
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+    import pyarrow.feather as feather
+    HAS_PYARROW = True
 except ImportError:
-    print("ERROR: config.py not found. Please copy config_template.py to config.py and add your API key.")
-    exit(1)
-
-# Configuration
-BASE_URL = CORE_STACK_BASE_URL
-HEADERS = {'X-API-Key': CORE_STACK_API_KEY}
+    HAS_PYARROW = False
+TIMESERIES_FORMAT = 'parquet' if HAS_PYARROW else 'csv'
+
+# Offline mode answers API calls from the response cache only (no HTTP)
+OFFLINE = bool(os.getenv('GHATY_OFFLINE'))
+
+@lru_cache(maxsize=None)
+def load_config():
+    """Import the Core Stack base URL and auth headers from config.py"""
+    try:
+        from config import CORE_STACK_API_KEY, CORE_STACK_BASE_URL
+    except ImportError:
+        print("ERROR: config.py not found. Please copy config_template.py to config.py and add your API key.")
+        sys.exit(1)
+    return CORE_STACK_BASE_URL, {'X-API-Key': CORE_STACK_API_KEY}
 
 # Output directory
 OUTPUT_DIR = Path('outputs/forest_agriculture_analysis')
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
+# Response cache: body (and ETag, if served) of each successful API response
+API_CACHE_DB = OUTPUT_DIR / 'api_cache.sqlite'
+with closing(sqlite3.connect(API_CACHE_DB)) as conn, conn:
+    conn.execute('CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, etag TEXT, body TEXT)')
+
 # Load forest grid analysis
 print("=" * 80)
 print("FOREST-AGRICULTURE INTEGRATION ANALYSIS")
@@ -40,11 +70,6 @@ print("Investigating shade-grown vs. intensive cropping impacts on old-growth fo
 print("=" * 80)
 print()
 
-print("Loading forest grid analysis results...")
-grid_df = pd.read_csv('outputs/forest_typology_corrected/regional_forest_comparison.csv')
-print(f"  Loaded {len(grid_df)} grid cells")
-print()
-
 # Priority grids for analysis (from plan)
 priority_grids = {
     # High-risk transition zones (mixed old-growth/plantation)
@@ -62,6 +87,42 @@ priority_grids = {
     1: {'reason': 'High conversion (96.8% plantation), Goa-Karnataka', 'type': 'baseline_intensive'},
 }
 
+print("Loading forest grid analysis results...")
+REGIONAL_CSV = Path('outputs/forest_typology_corrected/regional_forest_comparison.csv')
+REGIONAL_ARROW = REGIONAL_CSV.with_suffix('.arrow')
+
+# Only the columns used below, with an explicit schema (no type inference)
+GRID_DTYPES = {
+    'grid_id': 'int32',
+    'lat_min': 'float32',
+    'lat_max': 'float32',
+    'lon_min': 'float32',
+    'lon_max': 'float32',
+    'old_growth_pct': 'float32',
+    'plantation_pct': 'float32',
+    'old_growth_km2': 'float32',
+    'plantation_km2': 'float32',
+}
+
+if HAS_PYARROW:
+    # Convert the CSV to uncompressed Feather once; later runs memory-map it
+    # and only materialize the priority rows
+    if not REGIONAL_ARROW.exists() or REGIONAL_ARROW.stat().st_mtime < REGIONAL_CSV.stat().st_mtime:
+        convert_options = pa_csv.ConvertOptions(
+            include_columns=list(GRID_DTYPES),
+            column_types={col: pa.from_numpy_dtype(np.dtype(dtype)) for col, dtype in GRID_DTYPES.items()}
+        )
+        feather.write_feather(pa_csv.read_csv(REGIONAL_CSV, convert_options=convert_options),
+                              REGIONAL_ARROW, compression='uncompressed')
+    table = feather.read_table(REGIONAL_ARROW, memory_map=True)
+    priority_ids = pa.array(list(priority_grids), type=pa.int32())
+    grid_df = table.filter(pc.is_in(table['grid_id'], value_set=priority_ids)).to_pandas()
+else:
+    grid_df = pd.read_csv(REGIONAL_CSV, usecols=list(GRID_DTYPES), dtype=GRID_DTYPES)
+    grid_df = grid_df[grid_df['grid_id'].isin(list(priority_grids))]
+print(f"  Loaded {len(grid_df)} priority grid cells")
+print()
+
 print("PRIORITY GRID CELLS FOR ANALYSIS:")
 print("-" * 80)
 for grid_id, info in priority_grids.items():
@@ -72,37 +133,100 @@ for grid_id, info in priority_grids.items():
     print(f"        Forest mix: {grid_row['old_growth_pct']:.1f}% old-growth, {grid_row['plantation_pct']:.1f}% plantation")
 print()
 
+# Progress output is buffered per grid and written in one call, so the
+# retry loops below never block on a stdout write between requests
+def log_line(log, message=''):
+    """Append a progress line to a grid's buffer, or print it if unbuffered"""
+    if log is None:
+        print(message)
+    else:
+        log.append(message)
+
+def flush_log(log):
+    """Write a grid's buffered progress lines with a single stdout write"""
+    sys.stdout.write('\n'.join(log) + '\n')
+
+# The Core Stack API is queried at most about once a second in total. Each
+# request reserves the next free slot under the lock and sleeps outside it,
+# so the concurrent grid workers share one throttle
+API_MIN_INTERVAL_S = 1.0
+_api_rate_lock = threading.Lock()
+_next_api_slot = 0.0
+
+def wait_for_api_slot():
+    """Block until this request's turn under the shared API rate limit"""
+    global _next_api_slot
+    with _api_rate_lock:
+        now = time.monotonic()
+        delay = _next_api_slot - now
+        _next_api_slot = max(now, _next_api_slot) + API_MIN_INTERVAL_S
+    if delay > 0:
+        time.sleep(delay)
+
+def fetch_json(path, params):
+    """GET a Core Stack API path, revalidating any cached copy with If-None-Match
+
+    Returns (status_code, payload): the decoded JSON for a 200 (or a 304
+    answered from the cache), the response text for anything else. In
+    offline mode a cache miss returns (None, None).
+    """
+    key = f"{path}?{urlencode(sorted(params.items()))}"
+    with closing(sqlite3.connect(API_CACHE_DB)) as conn:
+        cached = conn.execute('SELECT etag, body FROM responses WHERE key = ?', (key,)).fetchone()
+    
+    if OFFLINE:
+        return (200, json.loads(cached[1])) if cached else (None, None)
+    
+    base_url, headers = load_config()
+    headers = dict(headers)
+    if cached and cached[0]:
+        headers['If-None-Match'] = cached[0]
+    
+    wait_for_api_slot()
+    response = requests.get(f"{base_url}/{path}", params=params, headers=headers, timeout=30)
+    if response.status_code == 304 and cached:
+        return 200, json.loads(cached[1])
+    if response.status_code == 200:
+        with closing(sqlite3.connect(API_CACHE_DB)) as conn, conn:
+            conn.execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?)',
+                         (key, response.headers.get('ETag'), response.text))
+        return 200, response.json()
+    return response.status_code, response.text
+
 # Helper functions for API calls
-def get_mws_by_latlon(lat, lon, max_retries=3):
+def get_mws_by_latlon(lat, lon, max_retries=3, log=None):
     """Get MWS ID and administrative details for a lat/lon point"""
-    endpoint = f"{BASE_URL}/get_mwsid_by_latlon/"
+    path = 'get_mwsid_by_latlon/'
     params = {'latitude': lat, 'longitude': lon}
     
     for attempt in range(max_retries):
         try:
-            response = requests.get(endpoint, params=params, headers=HEADERS, timeout=30)
-            if response.status_code == 200:
-                return response.json()
-            elif response.status_code == 404:
-                print(f"    WARNING: Location ({lat:.4f}, {lon:.4f}) not in Core Stack coverage")
+            status_code, payload = fetch_json(path, params)
+            if status_code == 200:
+                return payload
+            elif status_code is None:
+                log_line(log, f"    WARNING: No cached response for {path} (offline mode)")
+                return None
+            elif status_code == 404:
+                log_line(log, f"    WARNING: Location ({lat:.4f}, {lon:.4f}) not in Core Stack coverage")
                 return None
             else:
-                print(f"    WARNING: API returned status {response.status_code}: {response.text}")
+                log_line(log, f"    WARNING: API returned status {status_code}: {payload}")
                 if attempt < max_retries - 1:
-                    time.sleep(2 ** attempt)  # Exponential backoff
+                    time.sleep(2 ** attempt + random.uniform(0, 1))  # Exponential backoff with jitter
                     continue
                 return None
         except Exception as e:
-            print(f"    ERROR: Error querying MWS: {e}")
+            log_line(log, f"    ERROR: Error querying MWS: {e}")
             if attempt < max_retries - 1:
-                time.sleep(2 ** attempt)
+                time.sleep(2 ** attempt + random.uniform(0, 1))
                 continue
             return None
     return None
 
-def get_kyl_indicators(state, district, tehsil, mws_id, max_retries=3):
+def get_kyl_indicators(state, district, tehsil, mws_id, max_retries=3, log=None):
     """Get cropping intensity and hydrological indicators for an MWS"""
-    endpoint = f"{BASE_URL}/get_mws_kyl_indicators/"
+    path = 'get_mws_kyl_indicators/'
     params = {
         'state': state,
         'district': district,
@@ -112,29 +236,32 @@ def get_kyl_indicators(state, district, tehsil, mws_id, max_retries=3):
     
     for attempt in range(max_retries):
         try:
-            response = requests.get(endpoint, params=params, headers=HEADERS, timeout=30)
-            if response.status_code == 200:
-                return response.json()
-            elif response.status_code == 404:
-                print(f"    WARNING: No KYL data for {mws_id} in {district}, {state}")
+            status_code, payload = fetch_json(path, params)
+            if status_code == 200:
+                return payload
+            elif status_code is None:
+                log_line(log, f"    WARNING: No cached response for {path} (offline mode)")
+                return None
+            elif status_code == 404:
+                log_line(log, f"    WARNING: No KYL data for {mws_id} in {district}, {state}")
                 return None
             else:
-                print(f"    WARNING: API returned status {response.status_code}")
+                log_line(log, f"    WARNING: API returned status {status_code}")
                 if attempt < max_retries - 1:
-                    time.sleep(2 ** attempt)
+                    time.sleep(2 ** attempt + random.uniform(0, 1))
                     continue
                 return None
         except Exception as e:
-            print(f"    ERROR: Error querying KYL indicators: {e}")
+            log_line(log, f"    ERROR: Error querying KYL indicators: {e}")
             if attempt < max_retries - 1:
-                time.sleep(2 ** attempt)
+                time.sleep(2 ** attempt + random.uniform(0, 1))
                 continue
             return None
     return None
 
-def get_mws_timeseries(state, district, tehsil, mws_id, max_retries=3):
+def get_mws_timeseries(state, district, tehsil, mws_id, max_retries=3, log=None):
     """Get water balance time series (precipitation, ET, runoff) for an MWS"""
-    endpoint = f"{BASE_URL}/get_mws_data/"
+    path = 'get_mws_data/'
     params = {
         'state': state,
         'district': district,
@@ -144,26 +271,61 @@ def get_mws_timeseries(state, district, tehsil, mws_id, max_retries=3):
     
     for attempt in range(max_retries):
         try:
-            response = requests.get(endpoint, params=params, headers=HEADERS, timeout=30)
-            if response.status_code == 200:
-                return response.json()
-            elif response.status_code == 404:
-                print(f"    WARNING: No time series data for {mws_id}")
+            status_code, payload = fetch_json(path, params)
+            if status_code == 200:
+                return payload
+            elif status_code is None:
+                log_line(log, f"    WARNING: No cached response for {path} (offline mode)")
+                return None
+            elif status_code == 404:
+                log_line(log, f"    WARNING: No time series data for {mws_id}")
                 return None
             else:
-                print(f"    WARNING: API returned status {response.status_code}")
+                log_line(log, f"    WARNING: API returned status {status_code}")
                 if attempt < max_retries - 1:
-                    time.sleep(2 ** attempt)
+                    time.sleep(2 ** attempt + random.uniform(0, 1))
                     continue
                 return None
         except Exception as e:
-            print(f"    ERROR: Error querying time series: {e}")
+            log_line(log, f"    ERROR: Error querying time series: {e}")
             if attempt < max_retries - 1:
-                time.sleep(2 ** attempt)
+                time.sleep(2 ** attempt + random.uniform(0, 1))
                 continue
             return None
     return None
 
+def fetch_grid(grid_id):
+    """Run every Core Stack query for one grid cell as a single task
+
+    Returns {'mws': ..., 'kyl': ..., 'timeseries': ...}, each a (data, log)
+    pair. KYL and time series are only queried once an MWS is found.
+    """
+    grid_row = grid_df[grid_df['grid_id'] == grid_id].iloc[0]
+    lat_center = (grid_row['lat_min'] + grid_row['lat_max']) / 2
+    lon_center = (grid_row['lon_min'] + grid_row['lon_max']) / 2
+    
+    log = []
+    mws_data = get_mws_by_latlon(lat_center, lon_center, log=log)
+    results = {'mws': (mws_data, log), 'kyl': (None, []), 'timeseries': (None, [])}
+    
+    if mws_data:
+        for key, query in (('kyl', get_kyl_indicators), ('timeseries', get_mws_timeseries)):
+            log = []
+            data = query(mws_data['State'], mws_data['District'], mws_data['Tehsil'], mws_data['uid'], log=log)
+            results[key] = (data, log)
+    
+    return results
+
+# Query all priority grids concurrently; Phases 1, 2 and 4 consume the results
+API_WORKERS = 4
+
+print("Querying Core Stack API for all priority grids...")
+if not OFFLINE:
+    load_config()  # Fail fast on a missing config.py before starting workers
+with ThreadPoolExecutor(max_workers=API_WORKERS) as executor:
+    api_results = dict(zip(priority_grids, executor.map(fetch_grid, priority_grids)))
+print()
+
 # PHASE 1: Link Forest Grid Cells to Micro-Watersheds
 print("PHASE 1: LINKING FOREST GRID CELLS TO MICRO-WATERSHEDS")
 print("=" * 80)
@@ -172,18 +334,20 @@ print()
 grid_mws_data = []
 
 for grid_id in priority_grids.keys():
+    log = []
     grid_row = grid_df[grid_df['grid_id'] == grid_id].iloc[0]
     lat_center = (grid_row['lat_min'] + grid_row['lat_max']) / 2
     lon_center = (grid_row['lon_min'] + grid_row['lon_max']) / 2
     
-    print(f"Grid {grid_id} ({lat_center:.2f}°N, {lon_center:.2f}°E): Querying MWS...")
+    log.append(f"Grid {grid_id} ({lat_center:.2f}°N, {lon_center:.2f}°E): Querying MWS...")
     
-    mws_data = get_mws_by_latlon(lat_center, lon_center)
+    mws_data, api_log = api_results[grid_id]['mws']
+    log.extend(api_log)
     
     if mws_data:
-        print(f"  SUCCESS: Found MWS: {mws_data['uid']}")
-        print(f"    Admin: {mws_data['District']}, {mws_data['State']}")
-        print(f"    Tehsil: {mws_data['Tehsil']}")
+        log.append(f"  SUCCESS: Found MWS: {mws_data['uid']}")
+        log.append(f"    Admin: {mws_data['District']}, {mws_data['State']}")
+        log.append(f"    Tehsil: {mws_data['Tehsil']}")
         
         grid_mws_data.append({
             'grid_id': grid_id,
@@ -201,7 +365,7 @@ for grid_id in priority_grids.keys():
             'tehsil': mws_data['Tehsil']
         })
     else:
-        print(f"  FAILED: No MWS data available for this location")
+        log.append(f"  FAILED: No MWS data available for this location")
         # Still record grid data for reference
         grid_mws_data.append({
             'grid_id': grid_id,
@@ -219,8 +383,8 @@ for grid_id in priority_grids.keys():
             'tehsil': None
         })
     
-    print()
-    time.sleep(1)  # Rate limiting
+    log.append('')
+    flush_log(log)
 
 grid_mws_df = pd.DataFrame(grid_mws_data)
 print(f"Successfully linked {grid_mws_df['mws_id'].notna().sum()} grid cells to MWS")
@@ -232,6 +396,9 @@ grid_mws_df.to_csv(grid_mws_output, index=False)
 print(f"Saved grid-MWS linkage: {grid_mws_output}")
 print()
 
+# Linked grids as plain dicts, shared by Phases 2 and 4
+linked_records = grid_mws_df.loc[grid_mws_df['mws_id'].notna()].to_dict('records')
+
 # PHASE 2: Retrieve Cropping Intensity and Hydrological Indicators
 print("=" * 80)
 print("PHASE 2: RETRIEVING CROPPING INTENSITY & HYDROLOGICAL INDICATORS")
@@ -240,19 +407,20 @@ print()
 
 cropping_data = []
 
-for idx, row in grid_mws_df[grid_mws_df['mws_id'].notna()].iterrows():
-    print(f"Grid {int(row['grid_id'])} - MWS {row['mws_id']}: Querying KYL indicators...")
+for row in linked_records:
+    log = [f"Grid {int(row['grid_id'])} - MWS {row['mws_id']}: Querying KYL indicators..."]
     
-    kyl_data = get_kyl_indicators(row['state'], row['district'], row['tehsil'], row['mws_id'])
+    kyl_data, api_log = api_results[row['grid_id']]['kyl']
+    log.extend(api_log)
     
     if kyl_data and len(kyl_data) > 0:
         indicators = kyl_data[0]  # First element contains the data
-        print(f"  SUCCESS: Retrieved cropping intensity data")
-        print(f"    Avg cropping intensity: {indicators.get('cropping_intensity_avg', 'N/A'):.2f}")
-        print(f"    Trend: {indicators.get('cropping_intensity_trend', 'N/A')}")
-        print(f"    Avg precipitation: {indicators.get('avg_precipitation', 'N/A'):.1f} mm")
-        print(f"    Avg runoff: {indicators.get('avg_runoff', 'N/A'):.1f} mm")
-        print(f"    Dry spells: {indicators.get('avg_number_dry_spell', 'N/A'):.1f} events")
+        log.append(f"  SUCCESS: Retrieved cropping intensity data")
+        log.append(f"    Avg cropping intensity: {indicators.get('cropping_intensity_avg', 'N/A'):.2f}")
+        log.append(f"    Trend: {indicators.get('cropping_intensity_trend', 'N/A')}")
+        log.append(f"    Avg precipitation: {indicators.get('avg_precipitation', 'N/A'):.1f} mm")
+        log.append(f"    Avg runoff: {indicators.get('avg_runoff', 'N/A'):.1f} mm")
+        log.append(f"    Dry spells: {indicators.get('avg_number_dry_spell', 'N/A'):.1f} events")
         
         # Extract key metrics
         cropping_data.append({
@@ -280,7 +448,7 @@ for idx, row in grid_mws_df[grid_mws_df['mws_id'].notna()].iterrows():
             'terraincluster_id': indicators.get('terraincluster_id'),
         })
     else:
-        print(f"  FAILED: No KYL data available")
+        log.append(f"  FAILED: No KYL data available")
         cropping_data.append({
             'grid_id': row['grid_id'],
             'mws_id': row['mws_id'],
@@ -292,8 +460,8 @@ for idx, row in grid_mws_df[grid_mws_df['mws_id'].notna()].iterrows():
             'cropping_intensity_avg': None,
         })
     
-    print()
-    time.sleep(1)
+    log.append('')
+    flush_log(log)
 
 cropping_df = pd.DataFrame(cropping_data)
 print(f"Retrieved cropping intensity data for {cropping_df['cropping_intensity_avg'].notna().sum()} MWS")
@@ -320,40 +488,52 @@ if len(valid_df) > 0:
     # - Intensive: High cropping intensity (>1.5) + low old-growth % (<50%)
     # - Transition: Mixed characteristics
     
-    def classify_agroforestry_type(row):
-        ci = row['cropping_intensity_avg']
-        og_pct = row['old_growth_pct']
-        
-        if ci < 1.5 and og_pct > 70:
-            return 'Shade-grown/Sustainable'
-        elif ci > 1.5 and og_pct < 50:
-            return 'Intensive Agriculture'
-        else:
-            return 'Transition/Mixed'
-    
-    valid_df['agroforestry_type'] = valid_df.apply(classify_agroforestry_type, axis=1)
+    ci = valid_df['cropping_intensity_avg'].to_numpy(dtype=float)
+    og_pct = valid_df['old_growth_pct'].to_numpy(dtype=float)
+    conditions = [
+        (ci < 1.5) & (og_pct > 70),
+        (ci > 1.5) & (og_pct < 50),
+    ]
+    valid_df['agroforestry_type'] = np.select(
+        conditions,
+        ['Shade-grown/Sustainable', 'Intensive Agriculture'],
+        default='Transition/Mixed'
+    )
     
     # Summary statistics by type
     print("AGROFORESTRY TYPE CLASSIFICATION:")
     print("-" * 80)
     
+    summary_cols = [
+        'cropping_intensity_avg', 'old_growth_pct', 'avg_precipitation',
+        'avg_runoff', 'avg_number_dry_spell',
+    ]
+    has_cropping_mix = 'avg_single_cropped' in valid_df.columns
+    if has_cropping_mix:
+        summary_cols += ['avg_single_cropped', 'avg_double_cropped', 'avg_triple_cropped']
+    
+    # One grouped pass for every per-type mean instead of filtering per type
+    type_groups = valid_df.groupby('agroforestry_type')
+    type_means = type_groups[summary_cols].mean()
+    type_counts = type_groups.size()
+    
     for af_type in ['Shade-grown/Sustainable', 'Intensive Agriculture', 'Transition/Mixed']:
-        subset = valid_df[valid_df['agroforestry_type'] == af_type]
-        if len(subset) > 0:
-            print(f"\n{af_type}: ({len(subset)} grid cells)")
-            print(f"  Average cropping intensity: {subset['cropping_intensity_avg'].mean():.2f}")
-            print(f"  Average old-growth %: {subset['old_growth_pct'].mean():.1f}%")
-            print(f"  Average precipitation: {subset['avg_precipitation'].mean():.1f} mm")
-            print(f"  Average runoff: {subset['avg_runoff'].mean():.1f} mm")
-            print(f"  Average dry spells: {subset['avg_number_dry_spell'].mean():.1f} events")
+        if af_type in type_means.index:
+            means = type_means.loc[af_type]
+            print(f"\n{af_type}: ({type_counts[af_type]} grid cells)")
+            print(f"  Average cropping intensity: {means['cropping_intensity_avg']:.2f}")
+            print(f"  Average old-growth %: {means['old_growth_pct']:.1f}%")
+            print(f"  Average precipitation: {means['avg_precipitation']:.1f} mm")
+            print(f"  Average runoff: {means['avg_runoff']:.1f} mm")
+            print(f"  Average dry spells: {means['avg_number_dry_spell']:.1f} events")
             
-            if 'avg_single_cropped' in subset.columns:
-                print(f"  Single cropping: {subset['avg_single_cropped'].mean():.1f}%")
-                print(f"  Double cropping: {subset['avg_double_cropped'].mean():.1f}%")
-                print(f"  Triple cropping: {subset['avg_triple_cropped'].mean():.1f}%")
+            if has_cropping_mix:
+                print(f"  Single cropping: {means['avg_single_cropped']:.1f}%")
+                print(f"  Double cropping: {means['avg_double_cropped']:.1f}%")
+                print(f"  Triple cropping: {means['avg_triple_cropped']:.1f}%")
             
             print(f"\n  Grid cells:")
-            for _, row in subset.iterrows():
+            for _, row in type_groups.get_group(af_type).iterrows():
                 print(f"    - Grid {int(row['grid_id'])}: {row['district']}, {row['state']}")
     
     # Statistical comparison
@@ -415,18 +595,19 @@ print()
 
 timeseries_data = []
 
-for idx, row in grid_mws_df[grid_mws_df['mws_id'].notna()].iterrows():
-    print(f"Grid {int(row['grid_id'])} - MWS {row['mws_id']}: Querying time series...")
+for row in linked_records:
+    log = [f"Grid {int(row['grid_id'])} - MWS {row['mws_id']}: Querying time series..."]
     
-    ts_data = get_mws_timeseries(row['state'], row['district'], row['tehsil'], row['mws_id'])
+    ts_data, api_log = api_results[row['grid_id']]['timeseries']
+    log.extend(api_log)
     
     if ts_data and 'time_series' in ts_data:
         ts_records = ts_data['time_series']
-        print(f"  SUCCESS: Retrieved {len(ts_records)} time series records")
+        log.append(f"  SUCCESS: Retrieved {len(ts_records)} time series records")
         
         # Convert to DataFrame for analysis
         ts_df = pd.DataFrame(ts_records)
-        ts_df['date'] = pd.to_datetime(ts_df['date'])
+        ts_df['date'] = pd.to_datetime(ts_df['date'], format='ISO8601', cache=True)
         
         # Calculate trends and summary stats
         if len(ts_df) > 0:
@@ -453,14 +634,17 @@ for idx, row in grid_mws_df[grid_mws_df['mws_id'].notna()].iterrows():
             timeseries_data.append(summary)
             
             # Save individual time series
-            ts_output = OUTPUT_DIR / f'timeseries_grid{int(row["grid_id"])}_mws{row["mws_id"]}.csv'
-            ts_df.to_csv(ts_output, index=False)
-            print(f"    Saved to: {ts_output}")
+            ts_output = OUTPUT_DIR / f'timeseries_grid{int(row["grid_id"])}_mws{row["mws_id"]}.{TIMESERIES_FORMAT}'
+            if TIMESERIES_FORMAT == 'parquet':
+                ts_df.to_parquet(ts_output, engine='pyarrow', compression='zstd', index=False)
+            else:
+                ts_df.to_csv(ts_output, index=False)
+            log.append(f"    Saved to: {ts_output}")
     else:
-        print(f"  FAILED: No time series data available")
+        log.append(f"  FAILED: No time series data available")
     
-    print()
-    time.sleep(1)
+    log.append('')
+    flush_log(log)
 
 if len(timeseries_data) > 0:
     ts_summary_df = pd.DataFrame(timeseries_data)
@@ -488,7 +672,7 @@ if len(valid_df) > 0:
     print(f"  3. Agroforestry classification: {classified_output}")
 if len(timeseries_data) > 0:
     print(f"  4. Water balance summary: {ts_summary_output}")
-    print(f"  5. Individual time series: {len(timeseries_data)} files in {OUTPUT_DIR}")
+    print(f"  5. Individual time series: {len(timeseries_data)} {TIMESERIES_FORMAT.upper()} files in {OUTPUT_DIR}")
 print()
 
 print("NEXT STEPS:")
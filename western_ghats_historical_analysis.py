@@ -25,14 +25,15 @@
 # SETUP AND IMPORTS
 import ee
 import geopandas as gpd
+import shapely
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime
 import os
-import json
 import time
+from _json_io import write_json
 
 print("Initializing Google Earth Engine...")
 try:
@@ -119,15 +120,12 @@ try:
         gdf_buffered = gdf.buffer(0.0001).buffer(-0.0001)
         union_geom = gdf_buffered.unary_union
 
-        if union_geom.geom_type == 'Polygon':
-            coords = [list(union_geom.exterior.coords)]
-            return ee.Geometry.Polygon(coords)
-        elif union_geom.geom_type == 'MultiPolygon':
-            polygons = []
-            for polygon in union_geom.geoms:
-                coords = [list(polygon.exterior.coords)]
-                polygons.append(coords)
-            return ee.Geometry.MultiPolygon(polygons)
+        # Flatten to single polygons up front; a lone Polygon is simply a
+        # one-part MultiPolygon, so no per-type branching is needed
+        polygons = shapely.get_parts(union_geom)
+        return ee.Geometry.MultiPolygon(
+            [[shapely.get_coordinates(polygon.exterior).tolist()] for polygon in polygons]
+        )
 
     # Convert to Earth Engine geometry
     western_ghats_ee = convert_to_ee_geometry(western_ghats_wgs84)
@@ -458,27 +456,27 @@ print(f"Study area: {STUDY_AREA_KM2:.0f} km²")
 print("\n2. LAND COVER STATISTICS BY CLASS")
 print("-" * 80)
 
-for class_name in SIMPLIFIED_CLASSES.values():
-    if class_name in combined_df.columns and f'{class_name}_percent' in combined_df.columns:
-
-        # Get first and last year data
-        first_year = combined_df.iloc[0]
-        last_year = combined_df.iloc[-1]
-
-        # Calculate changes
-        area_change = last_year[class_name] - first_year[class_name]
-        pct_point_change = last_year[f'{class_name}_percent'] - first_year[f'{class_name}_percent']
-
-        if first_year[class_name] > 0:
-            relative_change = (area_change / first_year[class_name]) * 100
-        else:
-            relative_change = 0
-
+# First/last year of every class at once: one (2, n_classes) block for areas and
+# one for percentages (NaN where a class has no *_percent column)
+class_cols = [c for c in SIMPLIFIED_CLASSES.values() if c in combined_df.columns]
+has_pct = [f'{c}_percent' in combined_df.columns for c in class_cols]
+first_year_num, last_year_num = combined_df['year'].iloc[[0, -1]].astype(int)
+init_area, final_area = combined_df[class_cols].iloc[[0, -1]].to_numpy(dtype=float)
+init_pct, final_pct = (combined_df.reindex(columns=[f'{c}_percent' for c in class_cols])
+                       .iloc[[0, -1]].to_numpy(dtype=float))
+
+area_change = final_area - init_area
+pct_point_change = final_pct - init_pct
+relative_change = np.divide(area_change, init_area, out=np.zeros_like(area_change),
+                            where=init_area > 0) * 100
+
+for i, class_name in enumerate(class_cols):
+    if has_pct[i]:
         print(f"\n{class_name}:")
-        print(f"   {int(first_year['year'])}: {first_year[class_name]:.1f} km² ({first_year[f'{class_name}_percent']:.1f}%)")
-        print(f"   {int(last_year['year'])}: {last_year[class_name]:.1f} km² ({last_year[f'{class_name}_percent']:.1f}%)")
-        print(f"   Change: {area_change:+.1f} km² ({pct_point_change:+.1f} percentage points)")
-        print(f"   Relative change: {relative_change:+.1f}%")
+        print(f"   {first_year_num}: {init_area[i]:.1f} km² ({init_pct[i]:.1f}%)")
+        print(f"   {last_year_num}: {final_area[i]:.1f} km² ({final_pct[i]:.1f}%)")
+        print(f"   Change: {area_change[i]:+.1f} km² ({pct_point_change[i]:+.1f} percentage points)")
+        print(f"   Relative change: {relative_change[i]:+.1f}%")
 
 # Temporal trends
 print("\n3. TEMPORAL TRENDS")
@@ -530,24 +528,20 @@ stats_summary = {
         'datasets': combined_df['dataset'].unique().tolist(),
         'temporal_range': f"{int(combined_df['year'].min())}-{int(combined_df['year'].max())}"
     },
-    'land_cover_changes': {}
-}
-
-for class_name in SIMPLIFIED_CLASSES.values():
-    if class_name in combined_df.columns:
-        first_year = combined_df.iloc[0]
-        last_year = combined_df.iloc[-1]
-
-        stats_summary['land_cover_changes'][class_name] = {
-            'initial_area_km2': float(first_year[class_name]),
-            'final_area_km2': float(last_year[class_name]),
-            'absolute_change_km2': float(last_year[class_name] - first_year[class_name]),
-            'percentage_point_change': float(last_year[f'{class_name}_percent'] - first_year[f'{class_name}_percent']) if f'{class_name}_percent' in combined_df.columns else None
+    'land_cover_changes': {
+        class_name: {
+            'initial_area_km2': initial,
+            'final_area_km2': final,
+            'absolute_change_km2': change,
+            'percentage_point_change': pp_change if with_pct else None
         }
+        for class_name, initial, final, change, pp_change, with_pct
+        in zip(class_cols, init_area, final_area, area_change, pct_point_change, has_pct)
+    }
+}
 
 stats_file = f'outputs/western_ghats_statistical_summary_{timestamp}.json'
-with open(stats_file, 'w') as f:
-    json.dump(stats_summary, f, indent=2)
+write_json(stats_file, stats_summary)
 
 print(f"\nStatistical summary saved: {stats_file}")
 
@@ -655,7 +649,8 @@ plt.tight_layout()
 
 # Save comprehensive visualization
 viz_file = f'outputs/western_ghats_comprehensive_analysis_{timestamp}.png'
-plt.savefig(viz_file, dpi=300, bbox_inches='tight')
+# compress_level=1: much faster encode for a slightly larger file
+plt.savefig(viz_file, dpi=300, bbox_inches='tight', pil_kwargs={'compress_level': 1})
 plt.show()
 
 print(f"Comprehensive visualization saved: {viz_file}")